@@ -80,12 +80,10 @@ const AnimatedLoader = () => (
       axios.get(`${API}/eda/urban-rural`),
       axios.get(`${API}/eda/demand-distribution`),
       axios.get(`${API}/eda/correlation`),
-      axios.get(`${API}/eda/rolling-trend`),
-      axios.get(`${API}/eda/bias-variance`)
-
+      axios.get(`${API}/eda/rolling-trend`)
     ])
       .then(([
-        h, d, p, c, t, w, u, dist, corr, roll, biasVariance
+        h, d, p, c, t, w, u, dist, corr, roll
       ]) => {
         setHourly(h.data);
         setDaily(d.data);
@@ -98,8 +96,6 @@ const AnimatedLoader = () => (
         setCorrelation(corr.data);
         setRolling(roll.data);
         setLoading(false);
-        setBiasVariance(biasVariance.data);
-
       })
       .catch(err => {
         console.error(err);
@@ -107,6 +103,41 @@ const AnimatedLoader = () => (
       });
   }, []);
 
+  // Learning curve is computed as a background job: 202 + job id until ready
+  useEffect(() => {
+    let timer;
+    let cancelled = false;
+
+    const poll = (jobId) => {
+      axios.get(`${API}/jobs/${jobId}`)
+        .then(res => {
+          if (cancelled) return;
+          if (res.data.status === "done") {
+            setBiasVariance(res.data.result);
+          } else if (res.data.status === "running") {
+            timer = setTimeout(() => poll(jobId), 3000);
+          }
+        })
+        .catch(err => console.error(err));
+    };
+
+    axios.get(`${API}/eda/bias-variance`)
+      .then(res => {
+        if (cancelled) return;
+        if (res.status === 202) {
+          poll(res.data.job_id);
+        } else {
+          setBiasVariance(res.data);
+        }
+      })
+      .catch(err => console.error(err));
+
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, []);
+
 if (loading) {
   return (
     <>
@@ -171,7 +202,9 @@ if (loading) {
 
       
   <Section title="Bias–Variance Tradeoff (Learning Curve)">
-    <BiasVarianceChart data={biasVariance} />
+    {biasVariance
+      ? <BiasVarianceChart data={biasVariance} />
+      : <p className="text-gray-500">Computing learning curve…</p>}
   </Section>
 
 
@@ -111,6 +111,7 @@ const AnimatedLoader = () => (
 
       {/* LEARNING CURVE */}
       <Section title="Bias–Variance (Learning Curve)">
+        {learning_curve ? (
         <ResponsiveContainer width="100%" height={300}>
           <LineChart data={learning_curve.samples.map((s, i) => ({
             samples: s,
@@ -125,6 +126,11 @@ const AnimatedLoader = () => (
             <Line dataKey="val" stroke="#f97316" name="Validation Error" />
           </LineChart>
         </ResponsiveContainer>
+        ) : (
+          <p className="text-gray-500">
+            Learning curve not computed yet – open the EDA dashboard to start it.
+          </p>
+        )}
       </Section>
 
       {/* PEAK ACCURACY */}
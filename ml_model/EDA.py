@@ -3,10 +3,11 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from dataset import load_history
+
 sns.set_style("whitegrid")
 
-df = pd.read_csv("ml_model/models/electricity_demand_with_history.csv")
-df["Datetime"] = pd.to_datetime(df["Datetime"])
+df = load_history("ml_model/data/electricity_demand_with_history.csv")
 
 print(df.shape)
 print(df.head())
@@ -78,7 +79,7 @@ plt.show()
 
 
 
-city_avg = df.groupby("City")["Hourly_Electricity_Demand"].mean().sort_values()
+city_avg = df.groupby("City", observed=True)["Hourly_Electricity_Demand"].mean().sort_values()
 
 plt.figure(figsize=(8,4))
 city_avg.plot(kind="bar")
@@ -1,34 +1,206 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 import pandas as pd
-import joblib
+import hmac
+import json
+import os
+import threading
+import time
+from functools import wraps
 from flask_cors import CORS
 import numpy as np
-from sklearn.model_selection import learning_curve
 from sklearn.metrics import mean_squared_error
 
+from model_registry import REGISTRY_PATH, ModelRegistry, model_frame
+from forecasting import HISTORY, RollingFeatureState, calendar_features, recursive_forecast
+from online_features import OnlineFeatureStore
+from fuzzy_controller import INPUTS as FUZZY_INPUTS, INPUT_RANGE as FUZZY_RANGE, FuzzyEvaluator, load_or_compile
+from eda_cache import AggregateCache, dataset_version
+from eda_encoding import NotAcceptable, compress, encode, entity_tag, negotiate_encoding, negotiate_format
+from eda_series import InvalidWindow, build_daily, build_hourly, parse_window, select
+from eda_cube import DemandCube, InvalidAggregate, appended_rows, parse_query, row_signature
+from eda_store import CityStore
+from dataset import columnar_path, load_history
+from jobs import JobManager, artifact_key, compute_learning_curve
+from metrics import ApiMetrics
+from models.evaluation import METRIC_NAMES, RISK_LEVELS as EVAL_RISK_LEVELS, evaluation_path, load_evaluation
+
 
 app = Flask(__name__)
 CORS(app)
 
+# Prometheus metrics (GET /metrics): per-route counts / latency, handler
+# stages, inference time and batch sizes, cache hit ratios
+metrics = ApiMetrics()
+metrics.instrument(app)
+
 # =====================================================
 # LOAD ML MODEL (PIPELINE)
 # =====================================================
-MODEL_PATH = "ml_model/models/final_electricity_demand_model.pkl"
+MODEL_PATH = "ml_model/models/final_electricity_demand_model.pkl"   # registry seed
 DATA_PATH = "ml_model/data/electricity_demand_with_history.csv"
+JOB_RESULTS_DIR = "ml_model/models/cache"
+
+# Versioned artifacts; `registry.active` is the model serving requests
+# (a LoadedModel: pipeline + compiled fast path, warmed up). Handlers take
+# one reference per request so a hot swap never changes models mid-request.
+# Loaded by create_app(), like the rest of the serving state below.
+registry = None
+
+# Admin endpoints require this token in X-Admin-Token; without it set they
+# are disabled (they can swap the serving model)
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
 
-model = joblib.load(MODEL_PATH)
+# Background jobs for expensive, cacheable computations
+jobs = JobManager(JOB_RESULTS_DIR)
+
+# Per-city lag / rolling state fed by /ingest, snapshotted periodically
+FEATURE_STATE_PATH = os.path.join(JOB_RESULTS_DIR, "online_feature_state.joblib")
+FEATURE_SNAPSHOT_SECONDS = 60
+
+feature_store = None
 
 # =====================================================
-# LOAD DATASET FOR EDA (READ-ONLY)
+# FUZZY POWER-ADJUSTMENT CONTROLLER
 # =====================================================
-eda_df = pd.read_csv(DATA_PATH)
-eda_df["Datetime"] = pd.to_datetime(eda_df["Datetime"])
+# Same membership functions / rules as the Dash apps; requests are served
+# from the precompiled surface unless ?exact=1 asks for full inference
+power_evaluator = FuzzyEvaluator()
+power_surface = None
 
 # =====================================================
-# PEAK RISK THRESHOLDS
+# HOLDOUT EVALUATION ARTIFACT (written by training)
 # =====================================================
-P90 = np.percentile(eda_df["Hourly_Electricity_Demand"], 90)
-P95 = np.percentile(eda_df["Hourly_Electricity_Demand"], 95)
+MAX_PERFORMANCE_POINTS = 5000
+
+evaluation = None
+evaluation_version = None
+evaluation_lock = threading.Lock()
+performance_cache = AggregateCache(lambda obj: app.json.dumps(obj).encode("utf-8"))
+metrics.register_cache("performance", performance_cache)
+
+def get_evaluation():
+    # Reloaded (and the response cache dropped) whenever training rewrites it
+    # (the artifact belongs to the active model version)
+    global evaluation, evaluation_version
+
+    path = evaluation_path(registry.active.path)
+    version = (path, dataset_version(path))
+    if version != evaluation_version:
+        with evaluation_lock:
+            if version != evaluation_version:
+                evaluation = load_evaluation(path)
+                evaluation_version = version
+                performance_cache.clear()
+    return evaluation
+
+# =====================================================
+# LOAD DATASET FOR EDA (READ-ONLY)
+# =====================================================
+ROLLING_TREND_COLUMNS = ["Hourly_Electricity_Demand", "rolling_mean_24"]
+ROLLING_TREND_ROWS = 500     # default window: the latest rows
+
+# Finished /eda/* responses (body, Content-Encoding, mimetype) per format /
+# encoding, valid for one version of DATA_PATH
+eda_cache = AggregateCache(lambda payload: payload)
+metrics.register_cache("eda", eda_cache)
+data_lock = threading.Lock()
+eda_cube = eda_signature = data_version = None
+
+def load_eda_data(force=False):
+    # (Re)loads the dataset, recomputes the peak thresholds and drops every
+    # cached aggregate built from the previous version
+    global eda_df, eda_store, eda_cube, eda_signature, eda_daily, eda_hourly, data_version, city_meta, P90, P95
+
+    with data_lock:
+        version = dataset_version(DATA_PATH, columnar_path(DATA_PATH))
+        if version == data_version and not force:
+            return  # another request already loaded this version
+        df = load_history(DATA_PATH)
+
+        # Rows appended to the dataset are merged into the existing cube;
+        # anything else (rewritten / replaced file) rebuilds it
+        new_rows = appended_rows(eda_signature, df)
+        if new_rows is not None and eda_cube is not None:
+            eda_cube.append(new_rows)
+        else:
+            eda_cube = DemandCube.build(df)
+        eda_signature = row_signature(df)
+
+        # Compact copy partitioned by City; the loaded frame is dropped
+        eda_store = CityStore(df)
+        eda_df = eda_store.frame
+        del df, new_rows
+        data_version = version
+
+        # Sorted, date-indexed series behind the ?start=&end=&max_points= charts
+        eda_daily = build_daily(eda_df, eda_store.partitions())
+        eda_hourly = build_hourly(eda_df, ROLLING_TREND_COLUMNS)
+
+        # City -> (State, UrbanRural), so /ingest callers can send just the City
+        meta = eda_df.drop_duplicates("City")[["City", "State", "UrbanRural"]]
+        city_meta = {city: (str(state), str(area)) for city, state, area in meta.itertuples(index=False)}
+
+        # =====================================================
+        # PEAK RISK THRESHOLDS
+        # =====================================================
+        P90 = np.percentile(eda_df["Hourly_Electricity_Demand"], 90)
+        P95 = np.percentile(eda_df["Hourly_Electricity_Demand"], 95)
+
+        eda_cache.clear()
+
+@app.before_request
+def refresh_eda_data():
+    # Only /eda/* serves the dataset; other routes never pay for the stat
+    if not request.path.startswith("/eda/"):
+        return
+    try:
+        if dataset_version(DATA_PATH, columnar_path(DATA_PATH)) != data_version:
+            load_eda_data()
+    except OSError as e:
+        # File being replaced; keep serving the loaded copy
+        app.logger.warning("EDA data reload failed, serving the previous version: %s", e)
+
+def cached_eda(view):
+    # The wrapped view returns plain data, or a DataFrame for tabular results
+    # (sent as records / columns / arrow, see eda_encoding.py); it only runs
+    # on a cache miss. Revalidation with If-None-Match never runs it at all.
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            fmt = negotiate_format(request.args.get("format"), request.accept_mimetypes)
+        except NotAcceptable as e:
+            return jsonify({"error": str(e)}), 406
+        encoding = negotiate_encoding(request.accept_encodings)
+
+        version = data_version
+        key = (version, request.path, tuple(sorted(request.args.items(multi=True))), fmt, encoding)
+        etag = entity_tag(version, key[1:])
+
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            def build():
+                body, mimetype = encode(view(*args, **kwargs), fmt, app.json.dumps)
+                return compress(body, encoding) + (mimetype,)
+
+            try:
+                body, content_encoding, mimetype = eda_cache.get(key, build)
+            except (InvalidWindow, InvalidAggregate) as e:
+                return jsonify({"error": str(e)}), 400
+            except NotAcceptable as e:
+                return jsonify({"error": str(e)}), 406
+            response = Response(body, mimetype=mimetype)
+            if content_encoding:
+                response.headers["Content-Encoding"] = content_encoding
+
+        # no-cache: browsers keep the body but revalidate on every visit
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        response.vary.update(["Accept", "Accept-Encoding"])
+        return response
+    return wrapper
+
+RISK_LEVELS = np.array(["NORMAL", "HIGH", "CRITICAL"])
 
 def classify_peak(value):
     if value >= P95:
@@ -38,6 +210,29 @@ def classify_peak(value):
     else:
         return "NORMAL"
 
+def classify_peak_array(values):
+    # 0 = NORMAL, 1 = HIGH, 2 = CRITICAL (same thresholds as classify_peak)
+    values = np.asarray(values, dtype=float)
+    levels = (values >= P90).astype(np.int8) + (values >= P95).astype(np.int8)
+    return RISK_LEVELS[levels]
+
+# =====================================================
+# MODEL INPUT SCHEMA
+# =====================================================
+REQUIRED_FEATURES = [
+    "State", "City", "UrbanRural",
+    "Hour", "DayOfWeek", "Month", "IsWeekend",
+    "Temperature", "Electricity_Price",
+    "load_t_1", "load_t_24", "load_t_168",
+    "rolling_mean_24", "rolling_max_24",
+    "rolling_std_24", "rolling_mean_168"
+]
+
+MAX_BATCH_ROWS = 100_000
+MAX_EXACT_ROWS = 2_000         # /optimize?exact=1: full inference is ~0.3 ms per row
+MAX_FORECAST_HORIZON = 168
+MAX_FORECAST_SERIES = 1000
+
 # =====================================================
 # HEALTH CHECK
 # =====================================================
@@ -47,11 +242,17 @@ def health():
         "status": "Electricity Demand API is running",
         "endpoints": [
             "/predict",
+            "/predict/batch",
+            "/forecast",
+            "/ingest",
+            "/optimize",
+            "/metrics",
             "/eda/hourly-trend",
             "/eda/daily-demand",
             "/eda/temp-vs-demand",
             "/eda/city-wise",
-            "/eda/daily-peak"
+            "/eda/daily-peak",
+            "/eda/aggregate"
         ]
     })
 
@@ -61,30 +262,362 @@ def health():
 @app.route("/predict", methods=["POST"])
 def predict():
     try:
-        data = request.json
-
-        required_features = [
-            "State", "City", "UrbanRural",
-            "Hour", "DayOfWeek", "Month", "IsWeekend",
-            "Temperature", "Electricity_Price",
-            "load_t_1", "load_t_24", "load_t_168",
-            "rolling_mean_24", "rolling_max_24",
-            "rolling_std_24", "rolling_mean_168"
-        ]
+        timer = metrics.stage_timer()
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"error": "Expected a JSON object"}), 400
+        response = {}
+
+        missing = [f for f in REQUIRED_FEATURES if f not in data]
+        if missing and "City" in data:
+            # Online mode: City (+ timestamp) + Temperature / Electricity_Price;
+            # lags, rolling stats and calendar come from the ingested readings
+            try:
+                target, features = feature_store.features(data["City"], data.get("timestamp"))
+            except LookupError as e:
+                return jsonify({"error": str(e)}), 404
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 409
+
+            calendar = calendar_features(np.array([target.to_datetime64()]))
+            features.update({name: int(values[0]) for name, values in calendar.items()})
+            data = {**features, **data}
+            response["timestamp"] = target.strftime("%Y-%m-%d %H:%M")
+            missing = [f for f in REQUIRED_FEATURES if f not in data]
+
+        if missing:
+            return jsonify({"error": f"Missing feature: {missing[0]}"}), 400
+
+        timer.mark("parse")
+
+        current = registry.active
+        start = time.perf_counter()
+        prediction = current.predict_one(data)
+        elapsed = time.perf_counter() - start
+        metrics.observe_inference(current.version, elapsed)
+        registry.shadow_score(lambda candidate: [candidate.predict_one(data)], elapsed, [prediction])
+        timer.mark("predict")
+
+        hourly_demand = round(prediction, 2)
+        risk_level = classify_peak(hourly_demand)
 
-        for feature in required_features:
-            if feature not in data:
-                return jsonify({"error": f"Missing feature: {feature}"}), 400
+        response.update({
+            "predicted_hourly_demand": hourly_demand,
+            "peak_risk_level": risk_level,
+            "model_version": current.version
+        })
+        body = jsonify(response)
+        timer.mark("serialize")
+        return body
 
-        df = pd.DataFrame([data])
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        prediction = model.predict(df)
-        hourly_demand = round(float(prediction[0]), 2)
-        risk_level = classify_peak(hourly_demand)
+# =====================================================
+# BATCH PREDICTION ENDPOINT
+# =====================================================
+def read_batch_rows():
+    # Accepts a JSON array, {"rows": [...]} or NDJSON (one row per line)
+    if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+        body = request.get_data(as_text=True)
+        return [json.loads(line) for line in body.splitlines() if line.strip()]
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get("rows")
+    return data
+
+
+@app.route("/predict/batch", methods=["POST"])
+def predict_batch():
+    try:
+        timer = metrics.stage_timer()
+        try:
+            rows = read_batch_rows()
+        except ValueError as e:
+            return jsonify({"error": f"Invalid NDJSON body: {e}"}), 400
+
+        if not isinstance(rows, list) or not rows:
+            return jsonify({"error": "Expected a non-empty array of rows"}), 400
+        if len(rows) > MAX_BATCH_ROWS:
+            return jsonify({"error": f"Batch too large (max {MAX_BATCH_ROWS} rows)"}), 413
+        timer.mark("parse")
+
+        df = pd.DataFrame.from_records(rows)
+
+        missing = [f for f in REQUIRED_FEATURES if f not in df.columns]
+        if missing:
+            return jsonify({"error": f"Missing feature: {missing[0]}"}), 400
+
+        # Null numerics are missing values, as on /predict
+        try:
+            df = model_frame(df, REQUIRED_FEATURES)
+        except ValueError as e:
+            return jsonify({"error": f"Invalid feature value: {e}"}), 400
+        timer.mark("frame")
+
+        current = registry.active
+        start = time.perf_counter()
+        raw = current.predict_frame(df)
+        elapsed = time.perf_counter() - start
+        metrics.observe_inference(current.version, elapsed, rows=len(df))
+        registry.shadow_score(lambda candidate: candidate.predict_frame(df), elapsed, raw, rows=len(df))
+        timer.mark("predict")
+
+        predictions = np.round(raw, 2)
+        risk_levels = classify_peak_array(predictions)
+
+        body = jsonify({
+            "count": len(predictions),
+            "predicted_hourly_demand": predictions.tolist(),
+            "peak_risk_level": risk_levels.tolist(),
+            "model_version": current.version
+        })
+        timer.mark("serialize")
+        return body
 
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# =====================================================
+# METER READING INGEST (ONLINE FEATURE STATE)
+# =====================================================
+@app.route("/ingest", methods=["POST"])
+def ingest():
+    # Rows: {"City", "timestamp", "Hourly_Electricity_Demand"} (+ "State" and
+    # "UrbanRural" for cities not in the training data); same body forms
+    # as /predict/batch
+    try:
+        try:
+            rows = read_batch_rows()
+        except ValueError as e:
+            return jsonify({"error": f"Invalid NDJSON body: {e}"}), 400
+
+        if not isinstance(rows, list) or not rows:
+            return jsonify({"error": "Expected a non-empty array of readings"}), 400
+        if len(rows) > MAX_BATCH_ROWS:
+            return jsonify({"error": f"Batch too large (max {MAX_BATCH_ROWS} rows)"}), 413
+
+        # Validate everything before touching the state
+        readings = []
+        introduced = {}          # City -> (State, UrbanRural) given in this batch
+        for i, row in enumerate(rows):
+            try:
+                city = row["City"]
+                state, area = city_meta.get(city, (None, None))
+                state, area = row.get("State", state), row.get("UrbanRural", area)
+                if state is not None and area is not None:
+                    introduced.setdefault(city, (state, area))
+                stamp = pd.Timestamp(row["timestamp"])
+                demand = float(row["Hourly_Electricity_Demand"])
+                if pd.isna(stamp):
+                    return jsonify({"error": f"Row {i}: timestamp is missing or invalid"}), 400
+                if not np.isfinite(demand):
+                    # NaN / inf would poison the city's running sums for good
+                    return jsonify({"error": f"Row {i}: Hourly_Electricity_Demand must be a finite number"}), 400
+                readings.append((stamp, city, demand, state, area))
+            except KeyError as e:
+                return jsonify({"error": f"Row {i}: missing field {e.args[0]}"}), 400
+            except (TypeError, ValueError) as e:
+                return jsonify({"error": f"Row {i}: {e}"}), 400
+
+        # A city new to the store needs State / UrbanRural on at least one
+        # of its rows (readings are applied in time order, not body order)
+        for i, (stamp, city, demand, state, area) in enumerate(readings):
+            if state is None or area is None:
+                if city in introduced:
+                    readings[i] = (stamp, city, demand) + introduced[city]
+                elif not feature_store.knows(city):
+                    return jsonify({"error": f"Row {i}: unknown city '{city}': State and UrbanRural are required"}), 400
+
+        accepted = stale = filled = 0
+        for stamp, city, demand, state, area in sorted(readings, key=lambda r: r[0]):
+            try:
+                result = feature_store.ingest(city, stamp, demand, state, area)
+            except (LookupError, ValueError) as e:
+                return jsonify({"error": str(e), "accepted": accepted}), 400
+            if result is None:
+                stale += 1
+            else:
+                accepted += 1
+                filled += result
+
+        cities = {r[1] for r in readings}
         return jsonify({
-            "predicted_hourly_demand": hourly_demand,
-            "peak_risk_level": risk_level
+            "accepted": accepted,
+            "stale": stale,
+            "filled_hours": filled,
+            "cities": {city: info for city, info in feature_store.status().items() if city in cities}
+        })
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/ingest", methods=["GET"])
+def ingest_status():
+    return jsonify(feature_store.status())
+
+# =====================================================
+# MULTI-STEP FORECAST ENDPOINT
+# =====================================================
+def per_hour(value, horizon, name):
+    # Exogenous input: one value for the whole horizon or one per hour
+    values = np.atleast_1d(np.asarray(value, dtype=float))
+    if not np.isfinite(values).all():
+        raise ValueError(f"{name} must be finite numbers (no null / NaN)")
+    if values.size == 1:
+        return np.repeat(values, horizon)
+    if values.shape != (horizon,):
+        raise ValueError(f"{name} must be a number or a list of {horizon} values")
+    return values
+
+
+@app.route("/forecast", methods=["POST"])
+def forecast():
+    # {"horizon": 24, "series": [{"State", "City", "UrbanRural",
+    #   "timestamp": last reading, "history": [>= 168 hourly values],
+    #   "Temperature": x | [x per hour], "Electricity_Price": x | [...]}]}
+    # A single series can also be posted without the "series" wrapper.
+    try:
+        timer = metrics.stage_timer()
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"error": "Expected a JSON object"}), 400
+
+        try:
+            horizon = int(data.get("horizon", 24))
+        except (TypeError, ValueError):
+            return jsonify({"error": "horizon must be an integer"}), 400
+        if not 1 <= horizon <= MAX_FORECAST_HORIZON:
+            return jsonify({"error": f"horizon must be between 1 and {MAX_FORECAST_HORIZON}"}), 400
+
+        series = data.get("series", [data])
+        if not isinstance(series, list) or not series:
+            return jsonify({"error": "Expected a non-empty list of series"}), 400
+        if len(series) > MAX_FORECAST_SERIES:
+            return jsonify({"error": f"Too many series (max {MAX_FORECAST_SERIES})"}), 413
+
+        static = {"State": [], "City": [], "UrbanRural": []}
+        exogenous = {"Temperature": [], "Electricity_Price": []}
+        states, last_times = [], []
+
+        for i, item in enumerate(series):
+            try:
+                for column in static:
+                    static[column].append(item[column])
+                for column in exogenous:
+                    exogenous[column].append(per_hour(item[column], horizon, column))
+                history = item["history"]
+                if not isinstance(history, list) or len(history) < HISTORY:
+                    raise ValueError(f"history must hold at least {HISTORY} hourly values")
+                if not np.isfinite(np.asarray(history, dtype=float)).all():
+                    raise ValueError("history must be finite numbers (no null / NaN)")
+                states.append(RollingFeatureState(history))
+                last_times.append(pd.Timestamp(item["timestamp"]))
+            except KeyError as e:
+                return jsonify({"error": f"Series {i}: missing field {e.args[0]}"}), 400
+            except (TypeError, ValueError) as e:
+                return jsonify({"error": f"Series {i}: {e}"}), 400
+
+        current = registry.active
+        exogenous = {column: np.stack(values) for column, values in exogenous.items()}
+        timer.mark("parse")
+
+        def predict_step(columns, n_rows):
+            # One model call per forecast step, all series at once
+            start = time.perf_counter()
+            values = current.predict_columns(columns, n_rows)
+            metrics.observe_inference(current.version, time.perf_counter() - start, rows=n_rows)
+            return values
+
+        predictions, times = recursive_forecast(
+            predict_step, static, states, last_times, horizon, exogenous
+        )
+        predictions = np.round(predictions, 2)
+        timer.mark("predict")
+
+        body = jsonify({
+            "horizon": horizon,
+            "model_version": current.version,
+            "forecasts": [
+                {
+                    "City": static["City"][i],
+                    "timestamps": pd.DatetimeIndex(times[i]).strftime("%Y-%m-%d %H:%M").tolist(),
+                    "predicted_hourly_demand": predictions[i].tolist(),
+                    "peak_risk_level": classify_peak_array(predictions[i]).tolist()
+                }
+                for i in range(len(states))
+            ]
+        })
+        timer.mark("serialize")
+        return body
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# =====================================================
+# FUZZY OPTIMIZATION ENDPOINT
+# =====================================================
+def read_fuzzy_inputs():
+    # Accepts {"energy_demand": [...], "available_power": [...], "grid_load": [...]}
+    # or the row forms of /predict/batch (objects or [ed, ap, gl] triples)
+    data = request.get_json(silent=True)
+    if isinstance(data, dict) and all(name in data for name in FUZZY_INPUTS):
+        columns = [np.atleast_1d(np.asarray(data[name], dtype=float)) for name in FUZZY_INPUTS]
+        if len({len(c) for c in columns}) != 1 or any(c.ndim != 1 for c in columns):
+            raise ValueError("Input arrays must be one-dimensional and of equal length")
+        return np.stack(columns)
+
+    rows = read_batch_rows()
+    if not isinstance(rows, list):
+        raise ValueError(f"Expected arrays {FUZZY_INPUTS} or a list of rows")
+    if rows and isinstance(rows[0], dict):
+        rows = [[row[name] for name in FUZZY_INPUTS] for row in rows]
+    values = np.asarray(rows, dtype=float)
+    if values.shape == (len(FUZZY_INPUTS),):
+        values = values[np.newaxis]          # a single [ed, ap, gl] triple
+    elif values.size == 0:
+        values = values.reshape(0, len(FUZZY_INPUTS))
+    if values.ndim != 2 or values.shape[1] != len(FUZZY_INPUTS):
+        raise ValueError(f"Expected rows of {len(FUZZY_INPUTS)} values {FUZZY_INPUTS}, got shape {values.shape}")
+    return values.T
+
+
+@app.route("/optimize", methods=["POST"])
+def optimize():
+    try:
+        try:
+            ed, aps, gl = inputs = read_fuzzy_inputs()
+        except (ValueError, TypeError, KeyError) as e:
+            return jsonify({"error": f"Invalid input: {e}"}), 400
+
+        if inputs.shape[1] == 0:
+            return jsonify({"error": "Expected at least one input"}), 400
+        if inputs.shape[1] > MAX_BATCH_ROWS:
+            return jsonify({"error": f"Batch too large (max {MAX_BATCH_ROWS} rows)"}), 413
+
+        lo, hi = FUZZY_RANGE
+        invalid = ~np.isfinite(inputs) | (inputs < lo) | (inputs > hi)
+        if invalid.any():
+            name, row = np.argwhere(invalid)[0]
+            return jsonify({"error": f"Row {row}: {FUZZY_INPUTS[name]} must be within [{lo:g}, {hi:g}]"}), 400
+
+        if request.args.get("exact", "0").lower() in ("1", "true", "yes"):
+            # Full Mamdani inference on the whole array: ~0.3 ms per row
+            if inputs.shape[1] > MAX_EXACT_ROWS:
+                return jsonify({"error": f"Too many rows for exact=1 (max {MAX_EXACT_ROWS})"}), 413
+            adjustment = power_evaluator.evaluate_batch(ed, aps, gl)
+            method, max_error = "exact", 0.0
+        else:
+            adjustment = power_surface.evaluate_batch(ed, aps, gl)
+            method, max_error = "surface", power_surface.max_error
+
+        return jsonify({
+            "count": int(adjustment.size),
+            "power_adjustment": (np.round(adjustment, 2) + 0.0).tolist(),   # no -0.0
+            "method": method,
+            "max_error": max_error
         })
 
     except Exception as e:
@@ -98,110 +631,91 @@ def predict():
 # 1. Hourly Demand Pattern
 # -----------------------------------------------------
 @app.route("/eda/hourly-trend", methods=["GET"])
+@cached_eda
 def eda_hourly_trend():
-    hourly_avg = (
-        eda_df
-        .groupby("Hour")["Hourly_Electricity_Demand"]
-        .mean()
-        .reset_index()
-    )
-    return jsonify(hourly_avg.to_dict(orient="records"))
+    return eda_cube.query(["Hour"]).rename(columns={"mean": "Hourly_Electricity_Demand"})
 
 # -----------------------------------------------------
 # 2. Daily Average Demand (Optional City Filter)
 # -----------------------------------------------------
 @app.route("/eda/daily-demand", methods=["GET"])
+@cached_eda
 def eda_daily_demand():
     city = request.args.get("city")
+    start, end, max_points = parse_window(request.args)
 
-    temp_df = eda_df.copy()
     if city:
-        temp_df = temp_df[temp_df["City"] == city]
-
-    daily = (
-        temp_df
-        .groupby(temp_df["Datetime"].dt.date)["Hourly_Electricity_Demand"]
-        .mean()
-        .reset_index()
-    )
+        # Built from the city's partition at load time
+        series = eda_daily["city_mean"].get(city)
+        if series is None:
+            return pd.DataFrame({"date": [], "avg_demand": []})
+    else:
+        series = eda_daily["mean"]
 
-    daily.columns = ["date", "avg_demand"]
-    return jsonify(daily.to_dict(orient="records"))
+    days, columns = select(series, start, end, max_points)
+    return pd.DataFrame({"date": days.date, "avg_demand": columns["value"]})
 
 # -----------------------------------------------------
 # 3. Temperature vs Demand (Sampled)
 # -----------------------------------------------------
 @app.route("/eda/temp-vs-demand", methods=["GET"])
+@cached_eda
 def eda_temp_vs_demand():
-    sample = eda_df.sample(2000, random_state=42)
-    return jsonify(
-        sample[["Temperature", "Hourly_Electricity_Demand"]]
-        .to_dict(orient="records")
-    )
+    # ?city= samples from that city's partition only; sampled in load
+    # order, so the points match those drawn from the unpartitioned frame
+    city = request.args.get("city")
+    rows = eda_store.in_load_order(city)
+    sample = rows.sample(min(2000, len(rows)), random_state=42)
+    return sample[["Temperature", "Hourly_Electricity_Demand"]].reset_index(drop=True)
 
 # -----------------------------------------------------
 # 4. City-wise Average Demand
 # -----------------------------------------------------
 @app.route("/eda/city-wise", methods=["GET"])
+@cached_eda
 def eda_city_wise():
-    city_avg = (
-        eda_df
-        .groupby("City")["Hourly_Electricity_Demand"]
-        .mean()
-        .reset_index()
-    )
-    return jsonify(city_avg.to_dict(orient="records"))
+    return eda_cube.query(["City"]).rename(columns={"mean": "Hourly_Electricity_Demand"})
 
 # -----------------------------------------------------
 # 5. Daily Peak Demand
 # -----------------------------------------------------
 @app.route("/eda/daily-peak", methods=["GET"])
+@cached_eda
 def eda_daily_peak():
-    daily_peak = (
-        eda_df
-        .groupby(eda_df["Datetime"].dt.date)["Hourly_Electricity_Demand"]
-        .max()
-        .reset_index()
-    )
-    daily_peak.columns = ["date", "peak_demand"]
-    return jsonify(daily_peak.to_dict(orient="records"))
+    # Min/max bucketing rather than LTTB: every peak survives downsampling
+    start, end, max_points = parse_window(request.args)
+    days, columns = select(eda_daily["max"], start, end, max_points, method="minmax")
+    return pd.DataFrame({"date": days.date, "peak_demand": columns["value"]})
 
 # -------------------
 # 6. weekend-vs-weekday
 # -------------------
 
 @app.route("/eda/weekend-vs-weekday", methods=["GET"])
+@cached_eda
 def eda_weekend_weekday():
-    grouped = (
-        eda_df
-        .groupby("IsWeekend")["Hourly_Electricity_Demand"]
-        .mean()
-        .reset_index()
-    )
+    grouped = eda_cube.query(["IsWeekend"]).rename(columns={"mean": "Hourly_Electricity_Demand"})
     grouped["Type"] = grouped["IsWeekend"].map({0: "Weekday", 1: "Weekend"})
-    return jsonify(grouped[["Type", "Hourly_Electricity_Demand"]].to_dict(orient="records"))
+    return grouped[["Type", "Hourly_Electricity_Demand"]]
 
 
 @app.route("/eda/urban-rural", methods=["GET"])
+@cached_eda
 def eda_urban_rural():
-    grouped = (
-        eda_df
-        .groupby("UrbanRural")["Hourly_Electricity_Demand"]
-        .mean()
-        .reset_index()
-    )
-    return jsonify(grouped.to_dict(orient="records"))
+    return eda_cube.query(["UrbanRural"]).rename(columns={"mean": "Hourly_Electricity_Demand"})
 
 
 @app.route("/eda/demand-distribution", methods=["GET"])
+@cached_eda
 def eda_demand_distribution():
     hist = np.histogram(eda_df["Hourly_Electricity_Demand"], bins=30)
-    return jsonify({
+    return {
         "bins": hist[1].tolist(),
         "counts": hist[0].tolist()
-    })
+    }
 
 @app.route("/eda/correlation", methods=["GET"])
+@cached_eda
 def eda_correlation():
     corr = (
         eda_df
@@ -210,147 +724,242 @@ def eda_correlation():
         .reset_index()
     )
     corr.columns = ["feature", "correlation"]
-    return jsonify(corr.to_dict(orient="records"))
+    return corr
 
 
 @app.route("/eda/rolling-trend", methods=["GET"])
+@cached_eda
 def eda_rolling_trend():
-    sample = eda_df.tail(500)
-    return jsonify(
-        sample[["Datetime", "Hourly_Electricity_Demand", "rolling_mean_24"]]
-        .to_dict(orient="records")
-    )
+    # Without a range: the latest ROLLING_TREND_ROWS hours
+    start, end, max_points = parse_window(request.args)
+    if start is None and end is None:
+        start = eda_hourly.index[max(len(eda_hourly) - ROLLING_TREND_ROWS, 0)]
+
+    times, columns = select(eda_hourly, start, end, max_points, column="Hourly_Electricity_Demand")
+    return pd.DataFrame({"Datetime": times, **columns})
+
+@app.route("/eda/aggregate", methods=["GET"])
+@cached_eda
+def eda_aggregate():
+    # Any rollup of the demand cube, e.g.
+    # ?group_by=Hour,City&filter=UrbanRural:Urban&stat=mean,max&start=2023-06-01
+    group_by, filters, stats = parse_query(request.args)
+    start, end, _ = parse_window(request.args)
+    return eda_cube.query(group_by, filters, stats, start, end)
+
+@app.route("/eda/reload", methods=["POST"])
+def eda_reload():
+    load_eda_data(force=True)
+    return jsonify({"status": "reloaded", "data_version": data_version})
 
 @app.route("/eda/bias-variance", methods=["GET"])
 def eda_bias_variance():
-    from sklearn.model_selection import learning_curve
-
-    # Prepare features & target (same as training)
-    df = eda_df.copy()
-    df = df.drop(columns=["Datetime"])
-    X = df.drop("Hourly_Electricity_Demand", axis=1)
-    y = df["Hourly_Electricity_Demand"]
-
-    train_sizes, train_scores, val_scores = learning_curve(
-        model,
-        X,
-        y,
-        cv=5,
-        scoring="neg_mean_squared_error",
-        train_sizes=np.linspace(0.1, 1.0, 6),
-        n_jobs=-1
-    )
+    # 30 pipeline fits: served from the persisted result for this model +
+    # dataset version, otherwise computed once as a background job
+    model_path = registry.active.path
+    key = artifact_key(model_path, DATA_PATH)
 
-    train_rmse = np.sqrt(-train_scores.mean(axis=1))
-    val_rmse = np.sqrt(-val_scores.mean(axis=1))
+    result = jobs.load_result("bias-variance", key)
+    if result is not None:
+        return jsonify(result)
 
+    job = jobs.submit("bias-variance", key, compute_learning_curve, model_path, DATA_PATH)
     return jsonify({
-        "train_sizes": train_sizes.tolist(),
-        "train_rmse": train_rmse.tolist(),
-        "val_rmse": val_rmse.tolist()
-    })
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "status_url": f"/jobs/{job['job_id']}"
+    }), 202
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = jobs.status(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+
+    if job["status"] == "done":
+        job["result"] = jobs.load_result(job["name"], job["key"])
+    return jsonify(job)
 
 
 
 # ---------------
 # model performnce api
 # ---------------
-@app.route("/model/performance", methods=["GET"])
-def model_performance():
-    return jsonify({
+def parse_time_arg(name):
+    value = request.args.get(name)
+    return np.datetime64(pd.Timestamp(value), "s") if value else None
+
+def build_performance(evaluation, start, end, offset, limit):
+    times = evaluation["time"]
+    lo = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+    hi = len(times) if end is None else int(np.searchsorted(times, end, side="right"))
+    page = slice(min(lo + offset, hi), min(lo + offset + limit, hi))
 
-        # ===============================
-        # OVERALL METRICS (KPI CARDS)
-        # ===============================
+    labels = np.char.replace(np.datetime_as_string(times[page], unit="m"), "T", " ")
+    actual = np.round(evaluation["actual"][page].astype(float), 2)
+    predicted = np.round(evaluation["predicted"][page].astype(float), 2)
+
+    confusion = evaluation["confusion"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        recall = np.diag(confusion) / confusion.sum(axis=1)
+
+    return {
         "metrics": {
-            "MAE": 44.11,
-            "RMSE": 55.47,
-            "R2": 0.895,
-            "SMAPE": 5.06
+            name: round(float(value), 3)
+            for name, value in zip(METRIC_NAMES, evaluation["metrics"])
         },
-
-        # ===============================
-        # ACTUAL vs PREDICTED (TIME SERIES)
-        # ===============================
         "prediction_vs_actual": [
-            {"time": "2024-01-01 00:00", "actual": 780, "predicted": 790},
-            {"time": "2024-01-01 01:00", "actual": 760, "predicted": 755},
-            {"time": "2024-01-01 02:00", "actual": 740, "predicted": 748},
-            {"time": "2024-01-01 03:00", "actual": 720, "predicted": 730},
-            {"time": "2024-01-01 04:00", "actual": 710, "predicted": 705},
-            {"time": "2024-01-01 05:00", "actual": 730, "predicted": 735},
-            {"time": "2024-01-01 06:00", "actual": 800, "predicted": 810},
-            {"time": "2024-01-01 07:00", "actual": 880, "predicted": 870},
-            {"time": "2024-01-01 08:00", "actual": 940, "predicted": 950},
-            {"time": "2024-01-01 09:00", "actual": 980, "predicted": 990},
-            {"time": "2024-01-01 10:00", "actual": 1020, "predicted": 1010},
-            {"time": "2024-01-01 11:00", "actual": 1050, "predicted": 1060},
-            {"time": "2024-01-01 12:00", "actual": 1080, "predicted": 1075},
-            {"time": "2024-01-01 13:00", "actual": 1100, "predicted": 1090},
-            {"time": "2024-01-01 14:00", "actual": 1120, "predicted": 1130},
-            {"time": "2024-01-01 15:00", "actual": 1150, "predicted": 1140},
-            {"time": "2024-01-01 16:00", "actual": 1180, "predicted": 1190},
-            {"time": "2024-01-01 17:00", "actual": 1200, "predicted": 1210},
-            {"time": "2024-01-01 18:00", "actual": 1250, "predicted": 1240},
-            {"time": "2024-01-01 19:00", "actual": 1300, "predicted": 1310},
-            {"time": "2024-01-01 20:00", "actual": 1280, "predicted": 1275},
-            {"time": "2024-01-01 21:00", "actual": 1240, "predicted": 1230},
-            {"time": "2024-01-01 22:00", "actual": 1180, "predicted": 1170},
-            {"time": "2024-01-01 23:00", "actual": 1050, "predicted": 1060}
+            {"time": t, "actual": a, "predicted": p}
+            for t, a, p in zip(labels.tolist(), actual.tolist(), predicted.tolist())
         ],
-
-        # ===============================
-        # ERRORS / RESIDUALS
-        # ===============================
         "errors": [
-            {"time": "00:00", "error": 10},
-            {"time": "01:00", "error": -5},
-            {"time": "02:00", "error": 8},
-            {"time": "03:00", "error": 10},
-            {"time": "04:00", "error": -5},
-            {"time": "05:00", "error": 5},
-            {"time": "06:00", "error": 10},
-            {"time": "07:00", "error": -10},
-            {"time": "08:00", "error": 10},
-            {"time": "09:00", "error": 10},
-            {"time": "10:00", "error": -10},
-            {"time": "11:00", "error": 10},
-            {"time": "12:00", "error": -5},
-            {"time": "13:00", "error": -10},
-            {"time": "14:00", "error": 10},
-            {"time": "15:00", "error": -10},
-            {"time": "16:00", "error": 10},
-            {"time": "17:00", "error": 10},
-            {"time": "18:00", "error": -10},
-            {"time": "19:00", "error": 10},
-            {"time": "20:00", "error": -5},
-            {"time": "21:00", "error": -10},
-            {"time": "22:00", "error": -10},
-            {"time": "23:00", "error": 10}
+            {"time": f"{hour:02d}:00", "error": round(float(mean), 2), "abs_error": round(float(mae), 2)}
+            for hour, (count, mean, mae) in enumerate(zip(
+                evaluation["residual_count"], evaluation["residual_mean"], evaluation["residual_mae"]
+            ))
+            if count
         ],
-
-        # ===============================
-        # LEARNING CURVE (BIAS–VARIANCE)
-        # ===============================
-        "learning_curve": {
-            "samples": [1000, 3000, 6000, 9000, 12000],
-            "train": [120, 92, 70, 55, 48],
-            "val": [145, 105, 78, 60, 55]
-        },
-
-        # ===============================
-        # PEAK LOAD CLASSIFICATION ACCURACY
-        # ===============================
         "peak_accuracy": {
-            "normal": 0.92,
-            "high": 0.88,
-            "critical": 0.84
+            level.lower(): (None if np.isnan(r) else round(float(r), 3))
+            for level, r in zip(EVAL_RISK_LEVELS, recall)
+        },
+        "peak_confusion": {
+            "levels": EVAL_RISK_LEVELS,
+            "counts": confusion.tolist()
+        },
+        "pagination": {
+            "offset": offset,
+            "limit": limit,
+            "total": hi - lo
         }
+    }
+
+def load_learning_curve():
+    # Only available once the /eda/bias-variance job has run for this version
+    result = jobs.load_result("bias-variance", artifact_key(registry.active.path, DATA_PATH))
+    if result is None:
+        return None
+    return {
+        "samples": result["train_sizes"],
+        "train": result["train_rmse"],
+        "val": result["val_rmse"]
+    }
+
+@app.route("/model/performance", methods=["GET"])
+def model_performance():
+    try:
+        evaluation = get_evaluation()
+    except OSError:
+        return jsonify({
+            "error": "No evaluation artifact; run ml_model/models/power_demand_model.py "
+                     "or ml_model/models/evaluation.py"
+        }), 404
+
+    try:
+        start = parse_time_arg("start")
+        end = parse_time_arg("end")
+        offset = max(int(request.args.get("offset", 0)), 0)
+        limit = min(max(int(request.args.get("limit", 24)), 1), MAX_PERFORMANCE_POINTS)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameter: {e}"}), 400
+
+    # The learning curve shows up once the bias-variance job has finished,
+    # so whether it is present is part of the cache key
+    learning_curve = load_learning_curve()
+
+    key = (start, end, offset, limit, learning_curve is not None)
+    payload = performance_cache.get(key, lambda: {
+        **build_performance(evaluation, start, end, offset, limit),
+        "learning_curve": learning_curve
     })
+    return Response(payload, mimetype="application/json")
+
+
+# =====================================================
+# MODEL REGISTRY ADMIN
+# =====================================================
+def admin_only(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({"error": "Admin API disabled (ADMIN_TOKEN is not set)"}), 403
+        token = request.headers.get("X-Admin-Token", "")
+        if not hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+            return jsonify({"error": "Admin token required"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@app.route("/admin/models", methods=["GET"])
+@admin_only
+def admin_models():
+    return jsonify(registry.status())
+
+
+@app.route("/admin/models", methods=["POST"])
+@admin_only
+def admin_register_model():
+    # {"version": "v2", "path": "ml_model/models/<artifact>.pkl"}
+    data = request.get_json(silent=True) or {}
+    if not data.get("version") or not data.get("path"):
+        return jsonify({"error": "version and path are required"}), 400
+    try:
+        entry = registry.register(data["version"], data["path"])
+    except PermissionError as e:
+        return jsonify({"error": str(e)}), 400
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+    return jsonify({"version": data["version"], **entry}), 201
+
+
+@app.route("/admin/models/<version>/deploy", methods=["POST"])
+@admin_only
+def admin_deploy_model(version):
+    # Loads + warms the version in the background, then either swaps it in
+    # ("activate", default) or scores it next to the active one ("shadow")
+    mode = (request.get_json(silent=True) or {}).get("mode", "activate")
+    if mode not in ("activate", "shadow"):
+        return jsonify({"error": "mode must be 'activate' or 'shadow'"}), 400
+    try:
+        task = registry.deploy(version, mode)
+    except KeyError:
+        return jsonify({"error": f"Unknown model version: {version}"}), 404
+    return jsonify({**task, "status_url": "/admin/models"}), 202
+
+
+@app.route("/admin/models/shadow", methods=["DELETE"])
+@admin_only
+def admin_stop_shadow():
+    shadow = registry.stop_shadow()
+    if shadow is None:
+        return jsonify({"error": "No shadow model"}), 404
+    return jsonify(shadow.report())
+
+
+# =====================================================
+# STARTUP
+# =====================================================
+def create_app():
+    # Loads the serving state: model, online features, fuzzy surface, EDA
+    # data. Kept out of module import because job workers are spawned
+    # processes that re-import this file as __mp_main__ and need none of it.
+    global registry, feature_store, power_surface
+
+    registry = ModelRegistry(REGISTRY_PATH, default_path=MODEL_PATH)
+    feature_store = OnlineFeatureStore.load(FEATURE_STATE_PATH)
+    feature_store.start_snapshots(FEATURE_SNAPSHOT_SECONDS)
+    power_surface = load_or_compile()
+    load_eda_data()
+    return app
 
 
 # =====================================================
 # RUN SERVER
 # =====================================================
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=3000, debug=True)
+    # API_PORT / API_DEBUG=0 let benchmarks start a plain (non-reloading) instance
+    create_app().run(host="0.0.0.0", port=int(os.environ.get("API_PORT", 3000)),
+            debug=os.environ.get("API_DEBUG", "1") != "0")
@@ -0,0 +1,270 @@
+import argparse
+import glob
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset import load_history
+
+# =====================================================
+# CONFIG
+# =====================================================
+# Starts ml_model/api.py on a free local port (no debugger / reloader),
+# drives concurrent load with plain urllib threads and reports throughput
+# and latency percentiles per endpoint. Results are stored per commit in
+# RESULTS_DIR so runs can be compared.
+API_PATH = "ml_model/api.py"
+DATA_PATH = "ml_model/data/electricity_demand_with_history.csv"
+RESULTS_DIR = "ml_model/benchmarks/results"
+
+FEATURES = [
+    "State", "City", "UrbanRural",
+    "Hour", "DayOfWeek", "Month", "IsWeekend",
+    "Temperature", "Electricity_Price",
+    "load_t_1", "load_t_24", "load_t_168",
+    "rolling_mean_24", "rolling_max_24",
+    "rolling_std_24", "rolling_mean_168"
+]
+
+# The requests EDADashboard.jsx fires together on every page load
+DASHBOARD = [
+    "/eda/hourly-trend", "/eda/daily-demand", "/eda/daily-peak", "/eda/city-wise",
+    "/eda/temp-vs-demand", "/eda/weekend-vs-weekday", "/eda/urban-rural",
+    "/eda/demand-distribution", "/eda/correlation", "/eda/rolling-trend"
+]
+
+# /eda/bias-variance is left out by default: its first call starts a
+# learning-curve job whose CPU use would skew every other number
+ENDPOINTS = ["/predict"] + DASHBOARD + ["/model/performance"]
+
+START_TIMEOUT = 180
+
+
+# =====================================================
+# API PROCESS
+# =====================================================
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_api(port):
+    # Werkzeug logs every request to stderr: send it to a file, a pipe that
+    # nobody reads fills up and blocks the server
+    env = dict(os.environ, API_PORT=str(port), API_DEBUG="0")
+    log = tempfile.TemporaryFile(mode="w+")
+    process = subprocess.Popen([sys.executable, API_PATH], env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            log.seek(0)
+            raise RuntimeError(f"API exited during startup:\n{log.read()[-2000:]}")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1).read()
+            return process
+        except OSError:
+            time.sleep(0.5)
+    process.kill()
+    raise RuntimeError(f"API did not answer within {START_TIMEOUT}s")
+
+
+def stop_api(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+# =====================================================
+# LOAD GENERATION
+# =====================================================
+def request_once(base, path, body=None):
+    # -> (seconds, status, response bytes)
+    data = None if body is None else json.dumps(body).encode("utf-8")
+    req = urllib.request.Request(base + path, data=data,
+                                 headers={"Content-Type": "application/json"} if data else {})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            size = len(response.read())
+            status = response.status
+    except urllib.error.HTTPError as e:
+        size, status = len(e.read()), e.code
+    except OSError:
+        size, status = 0, None
+    return time.perf_counter() - start, status, size
+
+
+def make_requests(path, n, predict_rows):
+    # (path, body) per request; /predict cycles through real dataset rows
+    if path == "/predict":
+        return [(path, predict_rows[i % len(predict_rows)]) for i in range(n)]
+    return [(path, None)] * n
+
+
+def run_load(base, requests, concurrency):
+    # Every worker thread pulls the next request until the list is used up
+    results = [None] * len(requests)
+    position = iter(range(len(requests)))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                i = next(position, None)
+            if i is None:
+                return
+            results[i] = request_once(base, *requests[i])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    return results, time.perf_counter() - start
+
+
+def summarize(results, elapsed):
+    seconds = np.array([r[0] for r in results]) * 1e3
+    ok = np.array([r[1] is not None and 200 <= r[1] < 300 for r in results])
+    p50, p95, p99 = np.percentile(seconds, [50, 95, 99])
+    return {
+        "requests": len(results),
+        "errors": int((~ok).sum()),
+        "throughput_rps": round(len(results) / elapsed, 1),
+        "p50_ms": round(p50, 2),
+        "p95_ms": round(p95, 2),
+        "p99_ms": round(p99, 2),
+        "max_ms": round(float(seconds.max()), 2),
+        "mean_bytes": int(np.mean([r[2] for r in results])),
+    }
+
+
+def run_dashboard(base, page_loads, concurrency):
+    # One page load = the dashboard's requests all at once; latency is
+    # until the last of them returns. `concurrency` page loads overlap.
+    def page_load(_):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(DASHBOARD)) as pool:
+            statuses = [status for _, status, _ in pool.map(lambda path: request_once(base, path), DASHBOARD)]
+        ok = all(status is not None and 200 <= status < 300 for status in statuses)
+        return time.perf_counter() - start, 200 if ok else 500, 0
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(page_load, range(page_loads)))
+    return results, time.perf_counter() - start
+
+
+# =====================================================
+# RESULTS PER COMMIT
+# =====================================================
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def previous_result(results_dir, commit):
+    # Most recent stored run of a different commit
+    paths = sorted(glob.glob(os.path.join(results_dir, "api_load-*.json")), key=os.path.getmtime)
+    for path in reversed(paths):
+        with open(path) as f:
+            result = json.load(f)
+        if result.get("commit") != commit:
+            return path, result
+    return None, None
+
+
+def print_row(name, stats, before=None):
+    line = (f"{name:<28}{stats['throughput_rps']:>9.1f}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}"
+            f"{stats['p99_ms']:>10.1f}{stats['errors']:>8}")
+    if before:
+        line += f"   p50 {stats['p50_ms'] / before['p50_ms'] - 1:+6.0%}  p95 {stats['p95_ms'] / before['p95_ms'] - 1:+6.0%}"
+    print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent load test of the Flask API")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="comma-separated paths")
+    parser.add_argument("--concurrency", type=int, default=8, help="client threads per endpoint")
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed requests per endpoint")
+    parser.add_argument("--page-loads", type=int, default=20,
+                        help="dashboard page loads (all EDA requests at once); 0 to skip")
+    parser.add_argument("--url", default=None, help="test a running API instead of starting one")
+    parser.add_argument("--results-dir", default=RESULTS_DIR)
+    parser.add_argument("--compare", default=None, help="result file to compare with (default: previous commit's)")
+    args = parser.parse_args()
+
+    df = load_history(DATA_PATH, columns=FEATURES)
+    sample = df.sample(min(500, len(df)), random_state=0).astype({"State": str, "City": str, "UrbanRural": str})
+    predict_rows = sample.to_dict(orient="records")
+
+    process = None
+    if args.url:
+        base = args.url.rstrip("/")
+    else:
+        port = free_port()
+        started = time.perf_counter()
+        process = start_api(port)
+        base = f"http://127.0.0.1:{port}"
+        print(f"API up on {base} after {time.perf_counter() - started:.1f}s")
+
+    report = {
+        "commit": git_commit(),
+        "date": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "config": {"concurrency": args.concurrency, "requests": args.requests, "cores": os.cpu_count()},
+        "endpoints": {},
+    }
+    try:
+        for path in args.endpoints.split(","):
+            run_load(base, make_requests(path, args.warmup, predict_rows), args.concurrency)
+            results, elapsed = run_load(base, make_requests(path, args.requests, predict_rows), args.concurrency)
+            report["endpoints"][path] = summarize(results, elapsed)
+
+        if args.page_loads:
+            results, elapsed = run_dashboard(base, args.page_loads, max(1, args.concurrency // 4))
+            report["dashboard_page_load"] = summarize(results, elapsed)
+    finally:
+        if process is not None:
+            stop_api(process)
+
+    compare_path, before = (args.compare, None) if args.compare else previous_result(args.results_dir, report["commit"])
+    if compare_path and before is None:
+        with open(compare_path) as f:
+            before = json.load(f)
+    before_endpoints = (before or {}).get("endpoints", {})
+
+    print(f"\n{'endpoint':<28}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}"
+          + (f"   vs {before['commit']}" if before else ""))
+    for path, stats in report["endpoints"].items():
+        print_row(path, stats, before_endpoints.get(path))
+    if "dashboard_page_load" in report:
+        print_row("dashboard page load", report["dashboard_page_load"], (before or {}).get("dashboard_page_load"))
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    out = os.path.join(args.results_dir, f"api_load-{report['commit']}.json")
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results saved as {out}")
@@ -0,0 +1,94 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset import load_history
+from eda_store import CityStore
+
+# =====================================================
+# CONFIG
+# =====================================================
+# Memory footprint and city-filtered query latency of the EDA data: the
+# frame as load_history returns it (what api.py used to keep and copy +
+# mask per request) against the compact, City-partitioned eda_store.
+# --repeat tiles the history (timestamps shifted) to emulate a longer one.
+DATA_PATH = "ml_model/data/electricity_demand_with_history.csv"
+TARGET = "Hourly_Electricity_Demand"
+
+
+def tile(df, repeat):
+    span = df["Datetime"].max() - df["Datetime"].min() + pd.Timedelta(hours=1)
+    copies = [df.assign(Datetime=df["Datetime"] + span * i) for i in range(repeat)]
+    return pd.concat(copies, ignore_index=True)
+
+
+def timed(fn, repeats):
+    # -> median milliseconds per call
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples)) * 1e3
+
+
+# What api.py did per request vs the same query on a partition
+def daily_mean_masked(df, city):
+    rows = df.copy()
+    rows = rows[rows["City"] == city]
+    return rows.groupby(rows["Datetime"].dt.date)[TARGET].mean()
+
+
+def daily_mean_partition(store, city):
+    # As build_daily does it per city (api.py then serves windows of it)
+    rows = store.partition(city)
+    return rows.groupby(rows["Datetime"].dt.normalize())[TARGET].mean()
+
+
+def sample_masked(df, city):
+    rows = df[df["City"] == city]
+    return rows.sample(min(2000, len(rows)), random_state=42)[["Temperature", TARGET]]
+
+
+def sample_partition(store, city):
+    rows = store.in_load_order(city)
+    return rows.sample(min(2000, len(rows)), random_state=42)[["Temperature", TARGET]]
+
+
+QUERIES = [
+    ("daily-demand?city=", daily_mean_masked, daily_mean_partition),
+    ("temp-vs-demand?city=", sample_masked, sample_partition),
+]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EDA store: memory and city-filtered query latency")
+    parser.add_argument("--repeat", default="1,10,100", help="comma-separated history multiples")
+    parser.add_argument("--queries", type=int, default=20, help="timed calls per query")
+    args = parser.parse_args()
+
+    base = load_history(DATA_PATH)
+    city = str(base["City"].iloc[-1])
+
+    for repeat in (int(n) for n in args.repeat.split(",")):
+        df = tile(base, repeat)
+        start = time.perf_counter()
+        store = CityStore(df)
+        build = time.perf_counter() - start
+
+        before = df.memory_usage(deep=True).sum() / 2**20
+        after = store.memory_bytes() / 2**20
+        print(f"\n{len(df):,} rows: load_history frame {before:.1f} MB, city store {after:.1f} MB "
+              f"({after / before - 1:+.0%}), store built in {build:.2f}s")
+        print(f"{'query (' + city + ')':<30}{'old ms':>10}{'store ms':>10}{'speedup':>10}")
+
+        for name, masked, partitioned in QUERIES:
+            old = timed(lambda: masked(df, city), args.queries)
+            new = timed(lambda: partitioned(store, city), args.queries)
+            print(f"{name:<30}{old:>10.2f}{new:>10.2f}{old / new:>9.1f}x")
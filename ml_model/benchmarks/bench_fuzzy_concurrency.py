@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import skfuzzy.control as ctrl
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fuzzy_controller import FuzzyEvaluator, build_control_system, compute_exact, load_or_compile
+
+# =====================================================
+# CONFIG
+# =====================================================
+# Runs the controller call a Dash callback makes from a thread pool, the
+# way a threaded WSGI server would, and checks every answer against a
+# single-threaded reference.
+N_CALLS = 600
+THREADS = [1, 2, 4, 8]
+SEED = 0
+
+
+def call(fn, p):
+    try:
+        return fn(*p)
+    except Exception:           # the shared simulation can also just crash
+        return np.nan
+
+
+def run(fn, inputs, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda p: call(fn, p), inputs))
+    return np.array(results, dtype=float), time.perf_counter() - start
+
+
+def report(name, threads, results, expected, elapsed, tolerance=1e-9):
+    failed = np.isnan(results)
+    mixed = int(np.sum(np.abs(results[~failed] - expected[~failed]) > tolerance))
+    print(f"{name:<16} threads={threads:<2} {len(results) / elapsed:10.0f} calls/s   "
+          f"mixed-up: {mixed:<4} failed: {int(failed.sum())}")
+
+
+if __name__ == "__main__":
+    # Shorter GIL time slices make interleavings (and so mix-ups) likelier
+    sys.setswitchinterval(1e-4)
+
+    rng = np.random.default_rng(SEED)
+    inputs = rng.integers(0, 101, size=(N_CALLS, 3)).tolist()
+
+    control_system = build_control_system()
+    reference = ctrl.ControlSystemSimulation(control_system)
+    expected = np.array([compute_exact(reference, *p) for p in inputs])
+
+    shared_sim = ctrl.ControlSystemSimulation(control_system)
+    evaluator = FuzzyEvaluator()
+    surface = load_or_compile()
+    expected_surface = surface.evaluate_batch(*np.array(inputs, dtype=float).T)
+
+    print(f"{N_CALLS} calls per run, {os.cpu_count()} CPU(s)\n")
+    for threads in THREADS:
+        # Old pattern: one module-level simulation shared by all callbacks
+        results, elapsed = run(lambda *p: compute_exact(shared_sim, *p), inputs, threads)
+        report("shared power_sim", threads, results, expected, elapsed)
+
+        results, elapsed = run(evaluator.evaluate, inputs, threads)
+        report("FuzzyEvaluator", threads, results, expected, elapsed)
+
+        results, elapsed = run(surface.evaluate, inputs, threads)
+        report("FuzzySurface", threads, results, expected_surface, elapsed)
+        print()
@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset import load_history
+from fast_predict import compile_pipeline
+
+# =====================================================
+# CONFIG
+# =====================================================
+MODEL_PATH = "ml_model/models/final_electricity_demand_model.pkl"
+DATA_PATH = "ml_model/data/electricity_demand_with_history.csv"
+N_CALLS = 2000
+
+FEATURES = [
+    "State", "City", "UrbanRural",
+    "Hour", "DayOfWeek", "Month", "IsWeekend",
+    "Temperature", "Electricity_Price",
+    "load_t_1", "load_t_24", "load_t_168",
+    "rolling_mean_24", "rolling_max_24",
+    "rolling_std_24", "rolling_mean_168"
+]
+
+
+def time_calls(fn, rows):
+    timings = np.empty(len(rows))
+    for i, row in enumerate(rows):
+        start = time.perf_counter()
+        fn(row)
+        timings[i] = time.perf_counter() - start
+    return timings * 1e6
+
+
+def report(name, timings):
+    p50, p99 = np.percentile(timings, [50, 99])
+    print(f"{name:<22} p50 = {p50:8.1f} us   p99 = {p99:8.1f} us")
+
+
+if __name__ == "__main__":
+    model = joblib.load(MODEL_PATH)
+    compiled = compile_pipeline(model)
+    if compiled is None:
+        sys.exit("Pipeline layout is not supported by the fast path")
+
+    df = load_history(DATA_PATH, columns=FEATURES)
+    rows = df.astype({"State": str, "City": str, "UrbanRural": str}).to_dict(orient="records")
+
+    # Correctness: compiled path vs full pipeline over the whole dataset
+    expected = model.predict(df[FEATURES])
+    actual = np.array([compiled.predict_one(row) for row in rows])
+    print(f"max |fast - pipeline| over {len(rows)} rows: {np.abs(actual - expected).max():.3e}")
+
+    sample = rows[:N_CALLS]
+    for row in sample[:50]:                       # warm-up
+        model.predict(pd.DataFrame([row]))
+        compiled.predict_one(row)
+
+    report("pipeline (DataFrame)", time_calls(lambda r: model.predict(pd.DataFrame([r])), sample))
+    report("compiled fast path", time_calls(compiled.predict_one, sample))
@@ -0,0 +1,94 @@
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+from sklearn.model_selection import TimeSeriesSplit, cross_val_score
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset import load_history
+from models.thread_topology import (
+    Topology, available_cores, encode_frame, parallel_config, positional_pipeline, resolve_topology, shared_arrays
+)
+
+# =====================================================
+# CONFIG
+# =====================================================
+# Same kind of work as the hyperparameter search: independent CV fits of
+# the demand pipeline, run under different workers x threads splits
+MODEL_PATH = "ml_model/models/final_electricity_demand_model.pkl"
+DATA_PATH = "ml_model/data/electricity_demand_with_history.csv"
+TARGET = "Hourly_Electricity_Demand"
+
+
+def default_topologies(cores):
+    # Every exact split of the cores, auto, and what n_jobs=-1 with
+    # XGBoost's default threading amounts to (cores x cores)
+    splits = [Topology(w, cores // w) for w in range(1, cores + 1) if cores % w == 0]
+    return [Topology(cores, cores)] + splits
+
+
+def run(pipeline, X, y, topology, folds, repeats):
+    # -> wall-clock seconds for `repeats` x `folds` fits
+    model = pipeline.set_params(model__n_jobs=topology.threads)
+    cv = TimeSeriesSplit(n_splits=folds)
+
+    with parallel_config(topology):
+        # Untimed pass: starts the loky workers (each imports xgboost) and
+        # lets them map the shared arrays
+        cross_val_score(model, X, y, cv=cv, n_jobs=topology.workers)
+
+        start = time.perf_counter()
+        for seed in range(repeats):
+            model.set_params(model__random_state=seed)
+            cross_val_score(model, X, y, cv=cv, n_jobs=topology.workers)
+        return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Training throughput per thread topology")
+    parser.add_argument("--topologies", default=None,
+                        help="comma-separated '<workers>x<threads>' (default: all splits of the cores)")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=2, help="CV runs per topology")
+    parser.add_argument("--n-estimators", type=int, default=200)
+    parser.add_argument("--pickled", action="store_true",
+                        help="also time each topology with the DataFrame pickled to workers")
+    args = parser.parse_args()
+
+    cores = available_cores()
+    if args.topologies:
+        topologies = [resolve_topology(spec) for spec in args.topologies.split(",")]
+    else:
+        topologies = default_topologies(cores)
+    auto = resolve_topology("auto", tasks=args.folds)
+
+    pipeline = joblib.load(MODEL_PATH).set_params(model__n_estimators=args.n_estimators)
+    df = load_history(DATA_PATH).drop(columns=["Datetime"])
+    X = df.drop(TARGET, axis=1)
+    y = df[TARGET]
+
+    fits = args.folds * args.repeats
+    print(f"{cores} cores, {len(X)} rows, {fits} fits of {args.n_estimators} trees per topology "
+          f"(auto = {auto.workers}x{auto.threads})\n")
+    print(f"{'topology':<12}{'data':<10}{'cpu threads':>12}{'wall s':>10}{'fits/s':>10}")
+
+    results = []
+    with shared_arrays(X=encode_frame(X), y=y.to_numpy(dtype=np.float64)) as shared:
+        positional = positional_pipeline(pipeline, X.columns)
+        for topology in topologies:
+            modes = [("memmap", positional, shared["X"], shared["y"])]
+            if args.pickled:
+                modes.append(("pickled", pipeline, X, y))
+            for mode, model, X_in, y_in in modes:
+                seconds = run(model, X_in, y_in, topology, args.folds, args.repeats)
+                results.append((topology, mode, seconds))
+                label = f"{topology.workers}x{topology.threads}" + (" *" if topology == auto else "")
+                print(f"{label:<12}{mode:<10}{topology.workers * topology.threads:>12}"
+                      f"{seconds:>10.2f}{fits / seconds:>10.2f}")
+
+    best = min(results, key=lambda r: r[2])
+    print(f"\nfastest: {best[0].workers}x{best[0].threads} ({best[1]}), {best[2]:.2f}s   (* = auto)")
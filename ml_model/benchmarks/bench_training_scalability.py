@@ -0,0 +1,320 @@
+import argparse
+import json
+import math
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import joblib
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "models"))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "syntheticData"))
+
+# =====================================================
+# CONFIG
+# =====================================================
+# Generates datasets of increasing size with the synthetic generator and
+# the streaming feature builder, then runs the training stages of
+# power_demand_model.py on each one in a fresh process, recording wall
+# time and peak RSS per stage.
+SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+STAGES = ["generate", "features", "load", "preprocess", "search", "final_fit", "save"]
+REPORT_PATH = "ml_model/benchmarks/results/training_scalability.json"
+BASELINE_PATH = "ml_model/benchmarks/baselines/training_scalability.json"
+
+# Flag a stage when it is this much slower / bigger than the baseline
+# (and above the absolute floor, so tiny stages do not flap)
+TIME_TOLERANCE = 0.25
+RSS_TOLERANCE = 0.20
+TIME_FLOOR_SECONDS = 0.5
+RSS_FLOOR_MB = 50.0
+
+
+# =====================================================
+# PEAK RSS SAMPLING
+# =====================================================
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss():
+    # Bytes resident right now (ru_maxrss is a lifetime peak and cannot be
+    # reset per stage)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class RssSampler:
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.start_rss = self.peak = current_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+
+@contextmanager
+def stage(results, name):
+    with RssSampler() as sampler:
+        start = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - start
+    results[name] = {
+        "seconds": round(seconds, 3),
+        "peak_rss_mb": round(sampler.peak / 2**20, 1),
+        "start_rss_mb": round(sampler.start_rss / 2**20, 1),
+    }
+
+
+# =====================================================
+# ONE DATASET SIZE (runs in its own process)
+# =====================================================
+def run_size(rows, workdir, search, n_iter, topology):
+    import data as synthetic
+    import dataset
+    from add_historical_features import build_streaming
+    from sklearn.model_selection import TimeSeriesSplit
+
+    import power_demand_model as trainer
+    from fast_search import fast_search
+    from thread_topology import resolve_topology
+
+    raw_path = os.path.join(workdir, "synthetic.csv")
+    history_path = os.path.join(workdir, "history.csv")
+    model_path = os.path.join(workdir, "model.pkl")
+    results = {}
+
+    # Keep every timestamp inside the datetime64[ns] range (see data.py)
+    rows_per_hour = max(1, math.ceil(rows / 1_000_000))
+
+    with stage(results, "generate"):
+        chunks = synthetic.iter_chunks(rows, rows_per_hour=rows_per_hour, render=synthetic.render_csv)
+        synthetic.write_dataset(chunks, csv_path=raw_path)
+
+    with stage(results, "features"):
+        build_streaming(raw_path, history_path, columnar=dataset.pq is not None)
+
+    with stage(results, "load"):
+        X, y, _ = trainer.load_data(history_path)
+        split_idx = int(len(X) * 0.8)
+        X_train, y_train = X.iloc[:split_idx], y.iloc[:split_idx]
+
+    if search == "fast":
+        topology = resolve_topology(topology, tasks=n_iter)
+        with stage(results, "preprocess"):
+            preprocessor = trainer.build_pipeline(X_train).named_steps["preprocessor"]
+            matrix = preprocessor.fit_transform(X_train).astype(np.float32)
+            folds = list(TimeSeriesSplit(n_splits=5).split(matrix))
+
+        with stage(results, "search"):
+            report = fast_search(matrix, y_train, folds, trainer.param_grid, n_iter=n_iter,
+                                 topology=topology, verbose=False)
+        del matrix
+    else:
+        # RandomizedSearchCV encodes inside each fit; preprocessing is
+        # timed on its own for comparison only
+        with stage(results, "preprocess"):
+            trainer.build_pipeline(X_train).named_steps["preprocessor"].fit_transform(X_train)
+        with stage(results, "search"):
+            _, report = trainer.full_search(X_train, y_train, n_iter,
+                                            resolve_topology(topology, tasks=n_iter * 5))
+
+    with stage(results, "final_fit"):
+        params = {name.replace("model__", ""): value for name, value in report["best_params"].items()}
+        model = trainer.build_pipeline(X_train, **params).fit(X_train, y_train)
+
+    with stage(results, "save"):
+        joblib.dump(model, model_path)
+
+    return {
+        "rows": rows,
+        "train_rows": split_idx,
+        "stages": results,
+        "best_params": report["best_params"],
+        "cv_rmse": report["cv_rmse"],
+        "model_mb": round(os.path.getsize(model_path) / 2**20, 2),
+    }
+
+
+# =====================================================
+# REPORT + BASELINE COMPARISON
+# =====================================================
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    import sklearn
+    import xgboost
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cores": os.cpu_count(),
+        "xgboost": xgboost.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def scaling_exponents(runs):
+    # Per stage, log(time ratio) / log(size ratio) between consecutive
+    # sizes: ~1 is linear, >1 is where a stage stops scaling
+    done = [run for run in runs if "stages" in run]
+    exponents = {}
+    for small, large in zip(done, done[1:]):
+        key = f"{small['rows']}->{large['rows']}"
+        exponents[key] = {}
+        for name in STAGES:
+            t0, t1 = small["stages"][name]["seconds"], large["stages"][name]["seconds"]
+            if t0 > 0 and t1 > 0:
+                exponents[key][name] = round(math.log(t1 / t0) / math.log(large["rows"] / small["rows"]), 2)
+    return exponents
+
+
+def regressions(report, baseline):
+    flags = []
+    base_runs = {run["rows"]: run for run in baseline.get("runs", []) if "stages" in run}
+    for run in report["runs"]:
+        base = base_runs.get(run["rows"])
+        if base is None:
+            continue
+        if "stages" not in run:
+            flags.append({"rows": run["rows"], "stage": None, "metric": "error", "detail": run["error"]})
+            continue
+        for name in STAGES:
+            now, then = run["stages"][name], base["stages"].get(name)
+            if then is None:
+                continue
+            checks = [
+                ("seconds", TIME_TOLERANCE, TIME_FLOOR_SECONDS),
+                ("peak_rss_mb", RSS_TOLERANCE, RSS_FLOOR_MB),
+            ]
+            for metric, tolerance, floor in checks:
+                if now[metric] > then[metric] * (1 + tolerance) and now[metric] - then[metric] > floor:
+                    flags.append({
+                        "rows": run["rows"], "stage": name, "metric": metric,
+                        "baseline": then[metric], "current": now[metric],
+                        "ratio": round(now[metric] / then[metric], 2)
+                    })
+    return flags
+
+
+def print_table(report):
+    print(f"\n{'rows':>12}  " + "".join(f"{name:>18}" for name in STAGES))
+    for run in report["runs"]:
+        if "stages" not in run:
+            print(f"{run['rows']:>12,}  {run['error']}")
+            continue
+        cells = [f"{run['stages'][n]['seconds']:8.2f}s {run['stages'][n]['peak_rss_mb']:6.0f}MB" for n in STAGES]
+        print(f"{run['rows']:>12,}  " + "".join(f"{cell:>18}" for cell in cells))
+
+    for span, exponents in report["scaling"].items():
+        print(f"scaling {span:>22}: " + "  ".join(f"{n} {e:+.2f}" for n, e in exponents.items()))
+
+
+def write_json(path, obj):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(obj, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Training wall time / peak RSS per stage and dataset size")
+    parser.add_argument("--sizes", default=",".join(str(n) for n in SIZES),
+                        help="comma-separated row counts")
+    parser.add_argument("--search", choices=["full", "fast"], default="fast")
+    parser.add_argument("--n-iter", type=int, default=4, help="search candidates per size")
+    parser.add_argument("--topology", default=None, help="'auto' or '<workers>x<threads>'")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds allowed per size")
+    parser.add_argument("--report", default=REPORT_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store this report as the new baseline")
+    parser.add_argument("--worker", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        result = run_size(args.worker, args.workdir, args.search, args.n_iter, args.topology)
+        print(json.dumps(result))
+        sys.exit(0)
+
+    runs = []
+    for rows in (int(n) for n in args.sizes.split(",")):
+        workdir = tempfile.mkdtemp(prefix=f"bench-train-{rows}-")
+        command = [sys.executable, os.path.abspath(__file__), "--worker", str(rows), "--workdir", workdir,
+                   "--search", args.search, "--n-iter", str(args.n_iter)]
+        if args.topology:
+            command += ["--topology", args.topology]
+
+        print(f"⏱  {rows:,} rows ...", flush=True)
+        try:
+            # Fresh process per size: freed memory is not returned to the OS,
+            # so an in-process loop would carry each size's peak into the next
+            done = subprocess.run(command, capture_output=True, text=True, timeout=args.timeout)
+            if done.returncode != 0:
+                runs.append({"rows": rows, "error": (done.stderr.strip().splitlines() or ["failed"])[-1]})
+            else:
+                runs.append(json.loads(done.stdout.strip().splitlines()[-1]))
+        except subprocess.TimeoutExpired:
+            runs.append({"rows": rows, "error": f"timed out after {args.timeout:.0f}s"})
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "environment": environment(),
+        "config": {"search": args.search, "n_iter": args.n_iter, "topology": args.topology},
+        "runs": runs,
+    }
+    report["scaling"] = scaling_exponents(runs)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    report["regressions"] = regressions(report, baseline) if baseline else None
+
+    write_json(args.report, report)
+    print_table(report)
+    print(f"\n✅ Report saved as {args.report}")
+
+    if args.save_baseline:
+        write_json(args.baseline, report)
+        print(f"✅ Baseline saved as {args.baseline}")
+    elif baseline is None:
+        print(f"   no baseline at {args.baseline} (create one with --save-baseline)")
+    elif report["regressions"]:
+        print(f"\n⚠️ {len(report['regressions'])} regression(s) against {args.baseline}:")
+        for flag in report["regressions"]:
+            print(f"   {flag}")
+        sys.exit(1)
+    else:
+        print(f"   no regressions against {args.baseline}")
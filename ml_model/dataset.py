@@ -0,0 +1,155 @@
+import hashlib
+import operator
+import os
+import sys
+import threading
+
+import pandas as pd
+
+# =====================================================
+# COLUMNAR HISTORY DATASET
+# =====================================================
+# The history CSV is the interchange format; next to it the pipeline keeps
+# a typed Parquet copy (categorical State/City/UrbanRural, native
+# timestamps). Every loader goes through load_history(), which prefers the
+# Parquet file when it is up to date and reads only the requested columns.
+
+CATEGORICAL_COLUMNS = ["State", "City", "UrbanRural"]
+TIME_COLUMN = "Datetime"
+
+# Row filters: [(column, op, value), ...], all must hold (pyarrow's format)
+FILTER_OPS = {"==": operator.eq, "!=": operator.ne, "<": operator.lt,
+              "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+# Parquet key/value metadata that ties the file to the CSV it came from
+SOURCE_KEY = b"source_csv_fingerprint"
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:          # optional: everything falls back to CSV
+    pa = pq = None
+
+
+def columnar_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+_fingerprints = {}
+_fingerprint_lock = threading.Lock()
+
+def csv_fingerprint(csv_path):
+    # sha256 of the whole file: any edit changes it, and (unlike mtime) it
+    # survives a git checkout. Memoized on (path, mtime, size), so the file
+    # is only read again after it changes.
+    stat = os.stat(csv_path)
+    stamp = (os.path.abspath(csv_path), stat.st_mtime_ns, stat.st_size)
+
+    with _fingerprint_lock:
+        digest = _fingerprints.get(stamp)
+    if digest is not None:
+        return digest
+
+    sha = hashlib.sha256()
+    with open(csv_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    digest = sha.hexdigest()
+
+    with _fingerprint_lock:
+        _fingerprints[stamp] = digest
+    return digest
+
+
+def to_columnar(df):
+    df = df.copy()
+    if TIME_COLUMN in df.columns:
+        df[TIME_COLUMN] = pd.to_datetime(df[TIME_COLUMN])
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("category")
+    return df
+
+
+class ColumnarWriter:
+    # Appends DataFrame chunks to one Parquet file with a fixed schema, so
+    # chunked producers (streaming feature builder) can emit it too
+
+    def __init__(self, path, source_csv=None):
+        if pq is None:
+            raise ImportError("pyarrow is required to write the columnar dataset")
+        self.path = path
+        self.source_csv = source_csv
+        self._tmp_path = f"{path}.tmp"
+        self._writer = None
+        self._schema = None
+
+    def write(self, df):
+        df = to_columnar(df)
+        if self._writer is None:
+            schema = pa.Schema.from_pandas(df, preserve_index=False)
+            # Categories differ between chunks: store plain dictionary<int32, string>
+            for column in CATEGORICAL_COLUMNS:
+                if column in df.columns:
+                    i = schema.get_field_index(column)
+                    schema = schema.set(i, pa.field(column, pa.dictionary(pa.int32(), pa.string())))
+            self._schema = schema
+            self._writer = pq.ParquetWriter(self._tmp_path, schema)
+        self._writer.write_table(pa.Table.from_pandas(df, schema=self._schema, preserve_index=False))
+
+    def close(self):
+        if self._writer is None:
+            return
+        if self.source_csv:
+            # Written last: a streaming producer finishes the CSV alongside
+            self._writer.add_key_value_metadata({SOURCE_KEY: csv_fingerprint(self.source_csv).encode()})
+        self._writer.close()
+        os.replace(self._tmp_path, self.path)
+
+
+def write_columnar(df, path, source_csv=None):
+    writer = ColumnarWriter(path, source_csv)
+    writer.write(df)
+    writer.close()
+
+
+def columnar_is_fresh(csv_path):
+    path = columnar_path(csv_path)
+    # Never fresh without its CSV: nothing to check it against
+    if pq is None or not os.path.exists(path) or not os.path.exists(csv_path):
+        return False
+    metadata = pq.read_metadata(path).metadata or {}
+    return metadata.get(SOURCE_KEY, b"").decode() == csv_fingerprint(csv_path)
+
+
+def source_path(csv_path):
+    # The file load_history() will actually read
+    return columnar_path(csv_path) if columnar_is_fresh(csv_path) else csv_path
+
+
+def load_history(csv_path, columns=None, filters=None):
+    # `filters` e.g. [("Datetime", ">", watermark)]: on the Parquet copy
+    # row groups outside the range are skipped without being decoded
+    if columnar_is_fresh(csv_path):
+        return pd.read_parquet(columnar_path(csv_path), columns=columns, filters=filters or None)
+
+    read = columns if columns is None or not filters else list(dict.fromkeys(columns + [f[0] for f in filters]))
+    parse_dates = [TIME_COLUMN] if read is None or TIME_COLUMN in read else False
+    df = pd.read_csv(csv_path, usecols=read, parse_dates=parse_dates)
+    if filters:
+        keep = pd.Series(True, index=df.index)
+        for column, op, value in filters:
+            keep &= FILTER_OPS[op](df[column], value)
+        df = df.loc[keep, columns or df.columns].reset_index(drop=True)
+    return to_columnar(df)
+
+
+# =====================================================
+# CONVERT AN EXISTING CSV
+# =====================================================
+# python ml_model/dataset.py ml_model/data/electricity_demand_with_history.csv
+if __name__ == "__main__":
+    for csv_path in sys.argv[1:]:
+        df = pd.read_csv(csv_path)
+        write_columnar(df, columnar_path(csv_path), source_csv=csv_path)
+        print(f"✅ {csv_path} -> {columnar_path(csv_path)} ({len(df)} rows)")
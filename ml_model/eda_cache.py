@@ -0,0 +1,66 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+# =====================================================
+# DATASET VERSION
+# =====================================================
+def dataset_version(*paths):
+    # mtime + size is enough to notice a file being rewritten or replaced;
+    # missing files are part of the version too (e.g. Parquet copy removed)
+    parts = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            parts.append(f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+        except FileNotFoundError:
+            parts.append("missing")
+    return "-".join(parts)
+
+
+# =====================================================
+# PRE-SERIALIZED AGGREGATE CACHE
+# =====================================================
+class AggregateCache:
+    # Stores finished response bodies (bytes) keyed by request path + args.
+    # Entries are only valid for one dataset version; clear() drops them all.
+
+    def __init__(self, serialize, max_entries=256):
+        self._serialize = serialize
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return payload
+            self.misses += 1
+            generation = self._generation
+
+        # Built outside the lock so one slow aggregate does not block the rest
+        payload = self._serialize(build())
+
+        with self._lock:
+            if generation != self._generation:   # data reloaded while building
+                return payload
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return payload
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,199 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# =====================================================
+# DEMAND AGGREGATE CUBE
+# =====================================================
+# sum / count / min / max / sum of squares of Hourly_Electricity_Demand
+# per (City, UrbanRural, Hour, DayOfWeek, Month, IsWeekend, date), built
+# with one groupby when the dataset loads and merged cell by cell when
+# rows are appended to it. Any rollup over those dimensions (Hour x City,
+# Month x UrbanRural, ...) is a bincount over the cube cells; mean, var
+# and std are derived from the additive measures, raw rows are never read.
+
+TARGET = "Hourly_Electricity_Demand"
+DIMENSIONS = ["City", "UrbanRural", "Hour", "DayOfWeek", "Month", "IsWeekend", "date"]
+INT_DIMENSIONS = ["Hour", "DayOfWeek", "Month", "IsWeekend"]
+MEASURES = ["sum", "count", "min", "max", "sumsq"]
+STATS = ["count", "sum", "mean", "min", "max", "var", "std"]
+
+
+class InvalidAggregate(ValueError):
+    pass
+
+
+def compact(cells):
+    # Category / int8 dimension columns: smaller cells, faster groupbys
+    return cells.astype({"City": "category", "UrbanRural": "category",
+                         **{name: np.int8 for name in INT_DIMENSIONS}})
+
+
+def rollup(cells, keys):
+    # Combines cells sharing `keys` -> MEASURES indexed by keys (sorted)
+    grouped = cells.groupby(keys, observed=True, sort=True)
+    totals = grouped[["sum", "count", "sumsq"]].sum()
+    totals["min"] = grouped["min"].min()
+    totals["max"] = grouped["max"].max()
+    return totals[MEASURES]
+
+
+def aggregate(rows):
+    # Raw rows -> cube cells: one row per distinct DIMENSIONS key
+    y = rows[TARGET].to_numpy(dtype=np.float64)
+    frame = pd.DataFrame({
+        "City": rows["City"].astype(str).to_numpy(),
+        "UrbanRural": rows["UrbanRural"].astype(str).to_numpy(),
+        **{name: rows[name].to_numpy(dtype=np.int64) for name in INT_DIMENSIONS},
+        "date": rows["Datetime"].dt.normalize().to_numpy(),
+        "sum": y, "count": np.ones(len(y), dtype=np.int64),
+        "min": y, "max": y, "sumsq": y * y,
+    })
+    return compact(rollup(frame, DIMENSIONS).reset_index())
+
+
+def row_signature(df):
+    # (rows, digest) of a dataset as loaded: the digest covers every row's
+    # Datetime, City and demand in order, so an edited row anywhere in the
+    # old part is caught, not only a changed first / last row
+    hashes = pd.util.hash_pandas_object(df[["Datetime", "City", TARGET]], index=False)
+    return len(df), hashlib.sha1(hashes.to_numpy().tobytes()).hexdigest()
+
+
+def appended_rows(signature, new):
+    # Rows of `new` past the end of the dataset `signature` was taken from,
+    # when `new` is that dataset with rows added at the end (identical
+    # prefix), else None
+    if signature is None or not signature[0] or len(new) <= signature[0]:
+        return None
+    if row_signature(new.iloc[:signature[0]]) != signature:
+        return None
+    return new.iloc[signature[0]:]
+
+
+class DemandCube:
+
+    def __init__(self, cells, rows):
+        self._set(cells)
+        self.rows = rows
+
+    def _set(self, cells):
+        # Cells plus, per dimension, its sorted distinct values and each
+        # cell's position in them. Swapped in as one tuple, so concurrent
+        # queries see either the old or the new cube.
+        codes, levels = {}, {}
+        for name in DIMENSIONS:
+            codes[name], levels[name] = pd.factorize(cells[name], sort=True)
+            levels[name] = np.asarray(levels[name])
+        self._state = (cells, codes, levels)
+
+    @property
+    def cells(self):
+        return self._state[0]
+
+    @classmethod
+    def build(cls, df):
+        return cls(aggregate(df), len(df))
+
+    def append(self, rows):
+        # New cells are added, cells that already exist are merged
+        cells = pd.concat([self.cells, aggregate(rows)], ignore_index=True)
+        shared = cells.duplicated(DIMENSIONS, keep=False).to_numpy()
+        if shared.any():
+            merged = rollup(cells[shared], DIMENSIONS).reset_index()
+            cells = pd.concat([cells[~shared], merged], ignore_index=True)
+
+        self._set(compact(cells))
+        self.rows += len(rows)
+
+    # ---------------- queries ----------------
+    def query(self, group_by=(), filters=None, stats=("mean",), start=None, end=None):
+        # -> DataFrame: one row per group (sorted), one column per stat
+        group_by = list(group_by)
+        for name in group_by + list(filters or {}):
+            if name not in DIMENSIONS:
+                raise InvalidAggregate(f"unknown dimension {name!r} (one of {', '.join(DIMENSIONS)})")
+        for stat in stats:
+            if stat not in STATS:
+                raise InvalidAggregate(f"unknown stat {stat!r} (one of {', '.join(STATS)})")
+
+        cells, codes, levels = self._state
+        mask = np.ones(len(cells), dtype=bool)
+        for name, values in (filters or {}).items():
+            mask &= np.isin(levels[name], values)[codes[name]]
+        if start is not None:
+            mask &= (levels["date"] >= pd.Timestamp(start).normalize().to_datetime64())[codes["date"]]
+        if end is not None:
+            mask &= (levels["date"] <= pd.Timestamp(end).to_datetime64())[codes["date"]]
+
+        # Group key = position in the product of the group_by levels; one
+        # bincount / reduceat per measure instead of a pandas groupby
+        sizes = [len(levels[name]) for name in group_by]
+        if group_by:
+            key = np.ravel_multi_index([codes[name][mask] for name in group_by], sizes)
+        else:
+            key = np.zeros(int(mask.sum()), dtype=np.int64)
+        groups, inverse = np.unique(key, return_inverse=True)
+        if not group_by and not len(groups):
+            groups, inverse = np.zeros(1, dtype=np.int64), inverse
+
+        selected = mask.all()
+        measures = {name: cells[name].to_numpy() if selected else cells[name].to_numpy()[mask] for name in MEASURES}
+        totals = {name: np.bincount(inverse, weights=measures[name], minlength=len(groups))
+                  for name in ["sum", "count", "sumsq"]}
+        if len(inverse):
+            order = np.argsort(inverse, kind="stable")
+            starts = np.searchsorted(inverse[order], np.arange(len(groups)))
+            totals["min"] = np.minimum.reduceat(measures["min"][order], starts)
+            totals["max"] = np.maximum.reduceat(measures["max"][order], starts)
+        else:
+            totals["min"] = totals["max"] = np.full(len(groups), np.nan)
+
+        result = pd.DataFrame(index=range(len(groups)))
+        positions = np.unravel_index(groups, sizes) if group_by else []
+        for name, position in zip(group_by, positions):
+            values = levels[name][position]
+            if name == "date":
+                values = pd.DatetimeIndex(values).date
+            elif name in INT_DIMENSIONS:
+                values = values.astype(np.int64)
+            result[name] = values
+
+        count = totals["count"]
+        total = totals["sum"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+            # Sample variance (ddof=1), as pandas .var() / .std()
+            var = np.clip(totals["sumsq"] - total * mean, 0, None) / (count - 1)
+        derived = {
+            "count": count.astype(np.int64), "sum": total, "mean": mean,
+            "min": totals["min"], "max": totals["max"],
+            "var": var, "std": np.sqrt(var),
+        }
+        for stat in stats:
+            result[stat] = derived[stat]
+        return result
+
+
+def parse_query(args):
+    # ?group_by=Hour,City&filter=City:Pune|Mumbai&filter=IsWeekend:1&stat=mean,max
+    # -> (group_by, filters, stats)
+    group_by = [name for name in args.get("group_by", "").split(",") if name]
+    stats = [name for name in args.get("stat", "mean").split(",") if name]
+
+    filters = {}
+    for item in args.getlist("filter"):
+        name, sep, values = item.partition(":")
+        if not sep or not values:
+            raise InvalidAggregate(f"filter must look like <dimension>:<value>|<value>, got {item!r}")
+        values = values.split("|")
+        try:
+            if name in INT_DIMENSIONS:
+                values = [int(v) for v in values]
+            elif name == "date":
+                values = [pd.Timestamp(v).normalize().to_datetime64() for v in values]
+        except ValueError as e:
+            raise InvalidAggregate(f"filter {name}: {e}") from e
+        filters[name] = values
+    return group_by, filters, stats
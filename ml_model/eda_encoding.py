@@ -0,0 +1,101 @@
+import gzip
+import hashlib
+import io
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:          # optional: ?format=arrow answers 406
+    pa = None
+
+try:
+    import brotli
+except ImportError:          # optional: gzip only
+    brotli = None
+
+# =====================================================
+# EDA RESPONSE FORMATS
+# =====================================================
+# Tabular EDA responses can be sent as
+#   records  [{"date": ..., "avg_demand": ...}, ...]  (default, what the dashboard reads)
+#   columns  {"date": [...], "avg_demand": [...]}     (keys once, not once per row)
+#   arrow    Arrow IPC stream                         (binary, typed columns)
+# chosen with ?format= or an Accept header. Bodies are compressed when the
+# client accepts it, and every response carries an ETag derived from the
+# dataset version so revisits revalidate with a 304 instead of a download.
+JSON_MIME = "application/json"
+ARROW_MIME = "application/vnd.apache.arrow.stream"
+FORMATS = ["records", "columns", "arrow"]
+
+# Below this the gzip header / CPU cost outweighs the saving
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+class NotAcceptable(ValueError):
+    pass
+
+
+def negotiate_format(requested, accept):
+    # `requested` is ?format=, `accept` a werkzeug MIMEAccept
+    if requested:
+        if requested not in FORMATS:
+            raise NotAcceptable(f"format must be one of {', '.join(FORMATS)}")
+        fmt = requested
+    elif accept.best_match([JSON_MIME, ARROW_MIME], default=JSON_MIME) == ARROW_MIME:
+        fmt = "arrow"
+    else:
+        fmt = "records"
+
+    if fmt == "arrow" and pa is None:
+        raise NotAcceptable("pyarrow is not installed on the server")
+    return fmt
+
+
+def negotiate_encoding(accept_encodings):
+    offers = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return accept_encodings.best_match(offers)
+
+
+def entity_tag(version, key):
+    # One tag per representation: dataset version + path/args + format +
+    # content encoding
+    return hashlib.sha1(repr((version, key)).encode("utf-8")).hexdigest()[:20]
+
+
+# =====================================================
+# ENCODING
+# =====================================================
+def encode(data, fmt, dumps):
+    # -> (body, mimetype). Anything but a DataFrame is sent as plain JSON,
+    # and only as records: other formats answer 406 rather than silently
+    # sending something else
+    if not isinstance(data, pd.DataFrame):
+        if fmt != "records":
+            raise NotAcceptable(f"format={fmt} is not available for this resource (records only)")
+        return dumps(data).encode("utf-8"), JSON_MIME
+    if fmt == "arrow":
+        # pandas schema metadata is ~1 KB of JSON per response; the column
+        # types already say everything a chart needs
+        table = pa.Table.from_pandas(data, preserve_index=False).replace_schema_metadata(None)
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue(), ARROW_MIME
+    if data.isna().to_numpy().any():
+        # NaN is not valid JSON: send null
+        data = data.astype(object).where(data.notna(), None)
+    if fmt == "columns":
+        return dumps(data.to_dict(orient="list")).encode("utf-8"), JSON_MIME
+    return dumps(data.to_dict(orient="records")).encode("utf-8"), JSON_MIME
+
+
+def compress(body, encoding):
+    # -> (body, Content-Encoding or None)
+    if encoding is None or len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY), "br"
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), "gzip"
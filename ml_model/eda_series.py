@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+# =====================================================
+# TIME-WINDOWED EDA SERIES
+# =====================================================
+# The chart endpoints (/eda/daily-demand, /eda/daily-peak,
+# /eda/rolling-trend) answer ?start=&end=&max_points= from series built
+# once per dataset version and indexed by a sorted DatetimeIndex: a window
+# is two binary searches, and downsampling only looks at the rows inside
+# it, so a request costs O(window) however long the history grows.
+
+TARGET = "Hourly_Electricity_Demand"
+MAX_POINTS = 20_000
+
+
+class InvalidWindow(ValueError):
+    pass
+
+
+def parse_window(args):
+    # -> (start, end, max_points) from ?start=&end=&max_points=; bounds are
+    # inclusive, any of them may be missing
+    try:
+        start = pd.Timestamp(args["start"]) if args.get("start") else None
+        end = pd.Timestamp(args["end"]) if args.get("end") else None
+        max_points = int(args["max_points"]) if args.get("max_points") else None
+    except ValueError as e:
+        raise InvalidWindow(f"Invalid query parameter: {e}") from e
+
+    if max_points is not None and not 3 <= max_points <= MAX_POINTS:
+        raise InvalidWindow(f"max_points must be between 3 and {MAX_POINTS}")
+    if start is not None and end is not None and start > end:
+        raise InvalidWindow("start is after end")
+    return start, end, max_points
+
+
+class SeriesFrame:
+    # Columns of equal length over a sorted DatetimeIndex
+
+    def __init__(self, index, columns):
+        self.index = pd.DatetimeIndex(index)
+        self.columns = {name: np.asarray(values) for name, values in columns.items()}
+
+    def __len__(self):
+        return len(self.index)
+
+    def window(self, start=None, end=None):
+        # -> slice of positions with start <= time <= end
+        lo = 0 if start is None else int(self.index.searchsorted(start, side="left"))
+        hi = len(self.index) if end is None else int(self.index.searchsorted(end, side="right"))
+        return slice(lo, max(lo, hi))
+
+    def take(self, positions):
+        return self.index[positions], {name: values[positions] for name, values in self.columns.items()}
+
+
+def build_daily(df, partitions):
+    # At load time: daily mean / max overall, and the daily mean of each
+    # City from its own partition (see eda_store.py)
+    overall = df.groupby(df["Datetime"].dt.normalize())[TARGET].agg(["mean", "max"])
+
+    daily = {
+        "mean": SeriesFrame(overall.index, {"value": overall["mean"].to_numpy()}),
+        "max": SeriesFrame(overall.index, {"value": overall["max"].to_numpy()}),
+        "city_mean": {}
+    }
+    for city, rows in partitions.items():
+        series = rows.groupby(rows["Datetime"].dt.normalize())[TARGET].mean()
+        daily["city_mean"][city] = SeriesFrame(series.index, {"value": series.to_numpy()})
+    return daily
+
+
+def build_hourly(df, columns):
+    rows = df[["Datetime"] + columns]
+    if not rows["Datetime"].is_monotonic_increasing:
+        rows = rows.sort_values("Datetime", kind="stable")
+    return SeriesFrame(rows["Datetime"], {name: rows[name].to_numpy() for name in columns})
+
+
+# =====================================================
+# SHAPE-PRESERVING DOWNSAMPLING
+# =====================================================
+def lttb(x, y, n):
+    # Largest-Triangle-Three-Buckets: keeps the first and last point and,
+    # per bucket, the point spanning the largest triangle with the point
+    # kept before it and the mean of the next bucket. -> positions
+    size = len(y)
+    if n >= size or n < 3:
+        return np.arange(size)
+
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    edges = np.linspace(1, size - 1, n - 1).astype(np.int64)
+    kept = np.empty(n, dtype=np.int64)
+    kept[0], kept[-1] = 0, size - 1
+
+    previous = 0
+    for bucket in range(n - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        next_lo, next_hi = hi, edges[bucket + 2] if bucket + 2 < n - 1 else size
+        mean_x, mean_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+
+        area = np.abs(
+            (x[previous] - mean_x) * (y[lo:hi] - y[previous])
+            - (x[previous] - x[lo:hi]) * (mean_y - y[previous])
+        )
+        previous = lo + int(area.argmax())
+        kept[bucket + 1] = previous
+    return kept
+
+
+def minmax(y, n):
+    # Min and max of each of n // 2 equal buckets, in time order: spikes
+    # survive however far the series is reduced. -> positions
+    size = len(y)
+    buckets = n // 2
+    if n >= size or buckets < 1:
+        return np.arange(size)
+
+    edges = np.linspace(0, size, buckets + 1).astype(np.int64)
+    starts = edges[:-1]
+    low = np.minimum.reduceat(y, starts)
+    high = np.maximum.reduceat(y, starts)
+
+    kept = []
+    for start, stop, lo_value, hi_value in zip(starts, edges[1:], low, high):
+        chunk = y[start:stop]
+        kept.append(start + int(np.argmax(chunk == lo_value)))
+        kept.append(start + int(np.argmax(chunk == hi_value)))
+    return np.unique(kept)
+
+
+def select(frame, start=None, end=None, max_points=None, method="lttb", column="value"):
+    # -> (index, columns) for the window, reduced to max_points
+    window = frame.window(start, end)
+    index = frame.index[window]
+    values = frame.columns[column][window]
+
+    if max_points is None or len(index) <= max_points:
+        positions = window
+    elif method == "minmax":
+        positions = window.start + minmax(values, max_points)
+    else:
+        positions = window.start + lttb(index.asi8, values, max_points)
+    return frame.take(positions)
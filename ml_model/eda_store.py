@@ -0,0 +1,66 @@
+import numpy as np
+
+# =====================================================
+# COMPACT CITY-PARTITIONED EDA STORE
+# =====================================================
+# The EDA frame with narrow dtypes (category / int8 / float32), sorted by
+# (City, Datetime) so each city's rows are one contiguous block:
+# partition(city) is an iloc row slice, a view on the shared columns, and
+# a city-filtered query only reads that city's rows. `order` keeps each
+# row's position in the frame as loaded, for results that depend on row
+# order (random samples).
+#
+# Columns served verbatim by /eda routes keep float64 so their JSON does
+# not pick up float32 rounding noise (1234.56 -> 1234.56005859375); the
+# derived lag / rolling features only feed the correlation matrix.
+
+CATEGORY_COLUMNS = ["State", "City", "UrbanRural"]
+INT8_COLUMNS = ["Hour", "DayOfWeek", "Month", "IsWeekend"]
+FLOAT32_COLUMNS = ["load_t_1", "load_t_24", "load_t_168", "rolling_max_24", "rolling_std_24", "rolling_mean_168"]
+
+
+def compact(df):
+    dtypes = {name: "category" for name in CATEGORY_COLUMNS}
+    dtypes.update({name: np.int8 for name in INT8_COLUMNS})
+    dtypes.update({name: np.float32 for name in FLOAT32_COLUMNS})
+    return df.astype({name: dtype for name, dtype in dtypes.items() if name in df.columns})
+
+
+class CityStore:
+
+    def __init__(self, df):
+        frame = compact(df).reset_index(drop=True).sort_values(["City", "Datetime"], kind="stable")
+        order = frame.index.to_numpy()
+        frame = frame.reset_index(drop=True)
+        codes = frame["City"].cat.codes.to_numpy()
+        cities = frame["City"].cat.categories
+        edges = np.searchsorted(codes, np.arange(len(cities) + 1))
+
+        self.frame = frame
+        self.order = order
+        self.bounds = {
+            str(city): (int(edges[i]), int(edges[i + 1]))
+            for i, city in enumerate(cities) if edges[i + 1] > edges[i]
+        }
+
+    def __len__(self):
+        return len(self.frame)
+
+    def cities(self):
+        return list(self.bounds)
+
+    def partition(self, city):
+        # Unknown city -> empty frame with the same columns
+        start, stop = self.bounds.get(city, (0, 0))
+        return self.frame.iloc[start:stop]
+
+    def in_load_order(self, city=None):
+        # All rows, or one city's, in the order they were loaded
+        start, stop = self.bounds.get(city, (0, 0)) if city else (0, len(self.frame))
+        return self.frame.iloc[start:stop].iloc[np.argsort(self.order[start:stop], kind="stable")]
+
+    def partitions(self):
+        return {city: self.partition(city) for city in self.bounds}
+
+    def memory_bytes(self):
+        return int(self.frame.memory_usage(deep=True).sum())
@@ -0,0 +1,121 @@
+import threading
+
+import numpy as np
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder
+
+
+# =====================================================
+# COMPILED SINGLE-ROW INFERENCE
+# =====================================================
+# The fitted pipeline is ColumnTransformer(OneHotEncoder + passthrough)
+# followed by XGBRegressor. For one row, building a DataFrame and running
+# the ColumnTransformer costs far more than the trees themselves, so the
+# encoder layout is compiled once into plain dict lookups and the row is
+# written straight into a float32 buffer that goes to the booster.
+
+class CompiledPipeline:
+    def __init__(self, pipeline):
+        preprocessor = pipeline.named_steps["preprocessor"]
+        regressor = pipeline.named_steps["model"]
+
+        self.feature_names = list(preprocessor.feature_names_in_)
+        self.categorical = []   # (column, {category: output index})
+        self.numeric = []       # (column, output index)
+
+        offset = 0
+        for name, transformer, columns in preprocessor.transformers_:
+            if transformer == "drop" or len(columns) == 0:
+                continue
+
+            if isinstance(transformer, OneHotEncoder):
+                if transformer.drop_idx_ is not None or getattr(transformer, "_infrequent_enabled", False):
+                    raise ValueError(f"Unsupported OneHotEncoder options in '{name}'")
+                for column, categories in zip(columns, transformer.categories_):
+                    mapping = {category: offset + i for i, category in enumerate(categories)}
+                    self.categorical.append((column, mapping))
+                    offset += len(categories)
+
+            elif transformer == "passthrough" or (
+                isinstance(transformer, FunctionTransformer) and transformer.func is None
+            ):
+                for column in columns:
+                    self.numeric.append((column, offset))
+                    offset += 1
+
+            else:
+                raise ValueError(f"Unsupported transformer '{name}': {transformer!r}")
+
+        self.n_features = offset
+        self.booster = regressor.get_booster()
+
+        try:
+            self.iteration_range = (0, regressor.best_iteration + 1)
+        except AttributeError:
+            self.iteration_range = (0, 0)
+
+        self._local = threading.local()
+
+    def _buffer(self):
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = np.empty((1, self.n_features), dtype=np.float32)
+            self._local.row = row
+        return row
+
+    def transform_one(self, data, out=None):
+        row = self._buffer() if out is None else out
+        row.fill(0.0)
+        values = row[0]
+
+        for column, mapping in self.categorical:
+            index = mapping.get(data[column])
+            if index is not None:          # unknown category -> all zeros (handle_unknown="ignore")
+                values[index] = 1.0
+
+        for column, index in self.numeric:
+            value = data[column]
+            # null -> NaN: XGBoost treats it as missing, as pipeline.predict does
+            values[index] = np.nan if value is None else float(value)
+
+        return row
+
+    def predict_one(self, data):
+        row = self.transform_one(data)
+        prediction = self.booster.inplace_predict(
+            row,
+            iteration_range=self.iteration_range,
+            validate_features=False
+        )
+        return float(prediction[0])
+
+    def transform_columns(self, columns, n_rows):
+        # Column-oriented batch: {column: sequence of n_rows values}
+        matrix = np.zeros((n_rows, self.n_features), dtype=np.float32)
+        rows = np.arange(n_rows)
+
+        for column, mapping in self.categorical:
+            index = np.array([mapping.get(value, -1) for value in columns[column]])
+            known = index >= 0
+            matrix[rows[known], index[known]] = 1.0
+
+        for column, index in self.numeric:
+            matrix[:, index] = columns[column]
+
+        return matrix
+
+    def predict_columns(self, columns, n_rows):
+        prediction = self.booster.inplace_predict(
+            self.transform_columns(columns, n_rows),
+            iteration_range=self.iteration_range,
+            validate_features=False
+        )
+        return np.asarray(prediction, dtype=np.float64)
+
+
+def compile_pipeline(pipeline):
+    # Returns None when the pipeline layout is not one we know how to compile,
+    # so callers can fall back to pipeline.predict
+    try:
+        return CompiledPipeline(pipeline)
+    except (AttributeError, KeyError, ValueError):
+        return None
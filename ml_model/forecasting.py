@@ -0,0 +1,162 @@
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# =====================================================
+# ONLINE LAG / ROLLING FEATURE STATE
+# =====================================================
+# Same features as add_historical_features.py, but kept up to date one
+# reading at a time: running sums for the means, a monotonic deque for
+# the 24h max and a sliding Welford update for the 24h std. Every push is
+# O(1) regardless of the window lengths.
+#
+# At prediction time the hour being predicted is unknown, so the windows
+# here end at t-1 (the offline builder's windows include the row itself).
+
+HISTORY = 168
+SHORT_WINDOW = 24
+
+STATE_FEATURES = [
+    "load_t_1", "load_t_24", "load_t_168",
+    "rolling_mean_24", "rolling_max_24",
+    "rolling_std_24", "rolling_mean_168"
+]
+
+
+class RollingFeatureState:
+
+    def __init__(self, history=()):
+        # history: oldest-to-newest hourly readings; features are available
+        # once HISTORY readings have been pushed (see `ready`)
+        history = [float(v) for v in history]
+
+        self._ring = [0.0] * HISTORY   # last HISTORY readings, _head = oldest
+        self._head = 0
+        self._count = 0                # readings pushed so far (max-deque positions)
+
+        self._sum_168 = 0.0
+        self._sum_24 = 0.0
+        self._mean_24 = 0.0            # Welford mean / sum of squared deviations
+        self._m2_24 = 0.0
+        self._max_24 = deque()         # (position, value), values decreasing
+
+        for value in history[-HISTORY:]:
+            self.push(value)
+
+    @property
+    def ready(self):
+        return self._count >= HISTORY
+
+    @property
+    def readings(self):
+        return self._count
+
+    def lag(self, k):
+        # Reading k hours back (1 = most recent)
+        return self._ring[(self._head - k) % HISTORY]
+
+    def push(self, value):
+        value = float(value)
+        full = self._count >= HISTORY
+        oldest = self._ring[self._head]
+        leaving_24 = self.lag(SHORT_WINDOW) if self._count >= SHORT_WINDOW else None
+
+        # ---------------- 168h running sum ----------------
+        self._sum_168 += value - (oldest if full else 0.0)
+
+        # ---------------- 24h sum + Welford ----------------
+        n = min(self._count, SHORT_WINDOW)
+        if leaving_24 is not None:
+            n -= 1
+            if n > 0:
+                delta = leaving_24 - self._mean_24
+                self._mean_24 -= delta / n
+                self._m2_24 -= delta * (leaving_24 - self._mean_24)
+            else:
+                self._mean_24 = self._m2_24 = 0.0
+            self._sum_24 -= leaving_24
+
+        n += 1
+        delta = value - self._mean_24
+        self._mean_24 += delta / n
+        self._m2_24 += delta * (value - self._mean_24)
+        self._sum_24 += value
+
+        # ---------------- 24h max (monotonic deque) ----------------
+        while self._max_24 and self._max_24[-1][1] <= value:
+            self._max_24.pop()
+        self._max_24.append((self._count, value))
+        while self._max_24[0][0] <= self._count - SHORT_WINDOW:
+            self._max_24.popleft()
+
+        self._ring[self._head] = value
+        self._head = (self._head + 1) % HISTORY
+        self._count += 1
+
+    def features(self):
+        if not self.ready:
+            raise ValueError(f"Need {HISTORY} hourly readings, have {self._count}")
+        return {
+            "load_t_1": self.lag(1),
+            "load_t_24": self.lag(24),
+            "load_t_168": self.lag(168),
+            "rolling_mean_24": self._sum_24 / SHORT_WINDOW,
+            "rolling_max_24": self._max_24[0][1],
+            "rolling_std_24": math.sqrt(max(self._m2_24, 0.0) / (SHORT_WINDOW - 1)),
+            "rolling_mean_168": self._sum_168 / HISTORY,
+        }
+
+
+# =====================================================
+# CALENDAR FEATURES
+# =====================================================
+def calendar_features(times):
+    # Works on any shape of datetime64 array
+    times = np.asarray(times, dtype="datetime64[h]")
+    days = times.astype("datetime64[D]")
+    months = times.astype("datetime64[M]")
+    day_of_week = (days.astype(np.int64) + 3) % 7          # 1970-01-01 was a Thursday
+    return {
+        "Hour": (times - days).astype(np.int64),
+        "DayOfWeek": day_of_week,
+        "Month": months.astype(np.int64) % 12 + 1,
+        "IsWeekend": (day_of_week >= 5).astype(np.int64),
+    }
+
+
+# =====================================================
+# RECURSIVE MULTI-STEP FORECAST
+# =====================================================
+def recursive_forecast(predict, static, states, last_times, horizon, exogenous):
+    # predict(columns, n_rows) -> array of n_rows predictions
+    # static:     {column: [value per series]}   (State / City / UrbanRural)
+    # states:     [RollingFeatureState per series], advanced in place
+    # last_times: timestamp of each series' last reading
+    # exogenous:  {column: (n_series, horizon) array} (Temperature, price)
+    # One predict call per step covers every series.
+    n_series = len(states)
+    start = np.asarray(pd.DatetimeIndex(last_times), dtype="datetime64[h]")
+    times = start[:, None] + np.arange(1, horizon + 1)       # (n_series, horizon)
+    calendar = calendar_features(times)
+    predictions = np.empty((n_series, horizon))
+
+    for step in range(horizon):
+        columns = dict(static)
+        for name, values in calendar.items():
+            columns[name] = values[:, step]
+        for name, values in exogenous.items():
+            columns[name] = values[:, step]
+
+        features = [state.features() for state in states]
+        for name in STATE_FEATURES:
+            columns[name] = [f[name] for f in features]
+
+        predictions[:, step] = predict(columns, n_series)
+
+        # Feed each prediction back as the newest reading
+        for state, value in zip(states, predictions[:, step]):
+            state.push(value)
+
+    return predictions, times
@@ -0,0 +1,255 @@
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+import skfuzzy as fuzz
+import skfuzzy.control as ctrl
+
+# =====================================================
+# FUZZY POWER-ADJUSTMENT CONTROLLER
+# =====================================================
+# Single definition of the membership functions and rules used by the
+# Dash dashboards and the API.
+
+INPUTS = ["energy_demand", "available_power", "grid_load"]
+INPUT_RANGE = (0.0, 100.0)
+SURFACE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "fuzzy_surface.npz")
+CHUNK = 20000
+
+
+def build_control_system():
+    # Define fuzzy logic variables
+    energy_demand = ctrl.Antecedent(np.arange(0, 101, 1), 'energy_demand')
+    available_power = ctrl.Antecedent(np.arange(0, 101, 1), 'available_power')
+    grid_load = ctrl.Antecedent(np.arange(0, 101, 1), 'grid_load')
+    power_adjustment = ctrl.Consequent(np.arange(-50, 51, 1), 'power_adjustment')
+
+    # Membership functions
+    energy_demand.automf(3)
+    available_power.automf(3)
+    grid_load.automf(3)
+
+    power_adjustment['decrease'] = fuzz.trimf(power_adjustment.universe, [-50, -25, 0])
+    power_adjustment['maintain'] = fuzz.trimf(power_adjustment.universe, [-10, 0, 10])
+    power_adjustment['increase'] = fuzz.trimf(power_adjustment.universe, [0, 25, 50])
+
+    # Define fuzzy rules
+    rule1 = ctrl.Rule(energy_demand['good'] | available_power['poor'] | grid_load['good'], power_adjustment['increase'])
+    rule2 = ctrl.Rule(energy_demand['average'] | available_power['average'] | grid_load['average'], power_adjustment['maintain'])
+    rule3 = ctrl.Rule(energy_demand['poor'] | available_power['good'] | grid_load['poor'], power_adjustment['decrease'])
+
+    # Control system
+    return ctrl.ControlSystem([rule1, rule2, rule3])
+
+
+def compute_exact(sim, ed, aps, gl):
+    # Full Mamdani inference + centroid defuzzification (the reference)
+    sim.input['energy_demand'] = ed
+    sim.input['available_power'] = aps
+    sim.input['grid_load'] = gl
+    sim.compute()
+    return sim.output['power_adjustment']
+
+
+def compute_exact_chunked(control_system, ed, aps, gl, chunk=CHUNK):
+    # Array inputs, in chunks to bound scikit-fuzzy's temporaries (fresh
+    # simulation per chunk: it warns when input shapes change)
+    ed, aps, gl = (a.ravel() for a in np.broadcast_arrays(
+        np.asarray(ed, dtype=np.float64), np.asarray(aps, dtype=np.float64), np.asarray(gl, dtype=np.float64)
+    ))
+    values = np.empty(ed.size)
+    for start in range(0, ed.size, chunk):
+        part = slice(start, start + chunk)
+        sim = ctrl.ControlSystemSimulation(control_system, cache=False)
+        values[part] = compute_exact(sim, ed[part], aps[part], gl[part])
+    return values
+
+
+# =====================================================
+# RE-ENTRANT EVALUATOR
+# =====================================================
+class FuzzyEvaluator:
+    # scikit-fuzzy keeps the current inputs on the ControlSystem's variables
+    # (input['current']), so even separate simulations of one system
+    # overwrite each other across threads. Each thread therefore builds its
+    # own control system + simulation, once, and reuses it.
+
+    def __init__(self, factory=build_control_system):
+        self.factory = factory
+        self._local = threading.local()
+
+    def _state(self):
+        state = getattr(self._local, "state", None)
+        if state is None:
+            control_system = self.factory()
+            state = self._local.state = (control_system, ctrl.ControlSystemSimulation(control_system))
+        return state
+
+    def evaluate(self, ed, aps, gl):
+        return float(compute_exact(self._state()[1], ed, aps, gl))
+
+    def evaluate_batch(self, ed, aps, gl, chunk=CHUNK):
+        # Array inputs on this thread's system, in chunks (fresh simulation
+        # per chunk, no caching)
+        return compute_exact_chunked(self._state()[0], ed, aps, gl, chunk)
+
+
+# =====================================================
+# PRECOMPILED LOOKUP SURFACE
+# =====================================================
+class FuzzySurface:
+    # power_adjustment sampled on a regular grid over the 0-100 input cube;
+    # evaluation is trilinear interpolation between the 8 nearest samples
+
+    def __init__(self, values, lo=INPUT_RANGE[0], hi=INPUT_RANGE[1], max_error=None):
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.points = self.values.shape[0]
+        self.lo = float(lo)
+        self.hi = float(hi)
+        self.step = (self.hi - self.lo) / (self.points - 1)
+        self.max_error = max_error
+        self._flat = self.values.ravel().tolist()   # plain floats for the scalar path
+
+    @classmethod
+    def compile(cls, points=21, control_system=None, chunk=CHUNK):
+        control_system = control_system or build_control_system()
+        grid = np.linspace(INPUT_RANGE[0], INPUT_RANGE[1], points)
+        ed, aps, gl = np.meshgrid(grid, grid, grid, indexing="ij")
+        values = compute_exact_chunked(control_system, ed, aps, gl, chunk)
+        return cls(values.reshape(points, points, points))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            max_error = float(data["max_error"]) if "max_error" in data.files else None
+            return cls(data["values"], *data["range"], max_error=max_error)
+
+    def save(self, path):
+        extra = {} if self.max_error is None else {"max_error": self.max_error}
+        np.savez(path, values=self.values, range=np.array([self.lo, self.hi]), **extra)
+
+    def evaluate(self, ed, aps, gl):
+        # Scalar path: pure-Python arithmetic, no numpy dispatch per call
+        n = self.points
+        last = n - 2
+        lo, hi, step = self.lo, self.hi, self.step
+
+        fx = (min(max(ed, lo), hi) - lo) / step
+        fy = (min(max(aps, lo), hi) - lo) / step
+        fz = (min(max(gl, lo), hi) - lo) / step
+        ix = min(int(fx), last)
+        iy = min(int(fy), last)
+        iz = min(int(fz), last)
+        tx, ty, tz = fx - ix, fy - iy, fz - iz
+
+        v = self._flat
+        base = (ix * n + iy) * n + iz
+        c00 = v[base] + (v[base + 1] - v[base]) * tz
+        c01 = v[base + n] + (v[base + n + 1] - v[base + n]) * tz
+        base += n * n
+        c10 = v[base] + (v[base + 1] - v[base]) * tz
+        c11 = v[base + n] + (v[base + n + 1] - v[base + n]) * tz
+
+        c0 = c00 + (c01 - c00) * ty
+        c1 = c10 + (c11 - c10) * ty
+        return c0 + (c1 - c0) * tx
+
+    def evaluate_batch(self, ed, aps, gl):
+        coords = np.clip(np.stack(np.broadcast_arrays(
+            np.asarray(ed, dtype=np.float64),
+            np.asarray(aps, dtype=np.float64),
+            np.asarray(gl, dtype=np.float64)
+        )), self.lo, self.hi)
+
+        f = (coords - self.lo) / self.step
+        i = np.minimum(f.astype(np.intp), self.points - 2)
+        t = f - i
+        (ix, iy, iz), (tx, ty, tz) = i, t
+
+        v = self.values
+        c00 = v[ix, iy, iz] * (1 - tz) + v[ix, iy, iz + 1] * tz
+        c01 = v[ix, iy + 1, iz] * (1 - tz) + v[ix, iy + 1, iz + 1] * tz
+        c10 = v[ix + 1, iy, iz] * (1 - tz) + v[ix + 1, iy, iz + 1] * tz
+        c11 = v[ix + 1, iy + 1, iz] * (1 - tz) + v[ix + 1, iy + 1, iz + 1] * tz
+
+        c0 = c00 * (1 - ty) + c01 * ty
+        c1 = c10 * (1 - ty) + c11 * ty
+        return c0 * (1 - tx) + c1 * tx
+
+    def measure_error(self, refine=2, control_system=None, chunk=CHUNK):
+        # Max |surface - compute()| over a grid `refine` times finer than the
+        # surface's: with refine=2 every cell centre, face centre and edge
+        # midpoint, where interpolation is furthest from the samples.
+        # (Random inputs miss the narrow peaks: 2,000 of them gave 0.89
+        # against 2.29 here; refine=4 finds the same maximum.)
+        grid = np.linspace(self.lo, self.hi, (self.points - 1) * refine + 1)
+        ed, aps, gl = (a.ravel() for a in np.meshgrid(grid, grid, grid, indexing="ij"))
+
+        exact = compute_exact_chunked(control_system or build_control_system(), ed, aps, gl, chunk)
+        approx = self.evaluate_batch(ed, aps, gl)
+        self.max_error = float(np.max(np.abs(approx - exact)))
+        return self.max_error
+
+
+def load_or_compile(path=SURFACE_PATH, points=21):
+    try:
+        surface = FuzzySurface.load(path)
+        if surface.points == points:
+            return surface
+    except (OSError, KeyError, ValueError):
+        pass
+    surface = FuzzySurface.compile(points)
+    surface.measure_error()
+    try:
+        surface.save(path)
+    except OSError:
+        pass            # read-only deploy: keep the in-memory surface
+    return surface
+
+
+# =====================================================
+# COMPILE + REPORT
+# =====================================================
+# python ml_model/fuzzy_controller.py --points 21 --refine 2
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompile the fuzzy power-adjustment surface")
+    parser.add_argument("--points", type=int, default=21, help="grid points per input axis")
+    parser.add_argument("--refine", type=int, default=2, help="check grid points per surface cell edge")
+    parser.add_argument("--out", default=SURFACE_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    surface = FuzzySurface.compile(args.points)
+    print(f"Compiled {args.points}^3 surface in {time.perf_counter() - start:.2f}s")
+
+    max_error = surface.measure_error(args.refine)
+    check = (args.points - 1) * args.refine + 1
+    print(f"Max |surface - compute()| over a {check}^3 grid: {max_error:.4f}")
+
+    sim = ctrl.ControlSystemSimulation(build_control_system())
+    rng = np.random.default_rng(1)
+    points = rng.uniform(0, 100, size=(500, 3)).tolist()
+
+    start = time.perf_counter()
+    for p in points:
+        compute_exact(sim, *p)
+    exact_us = (time.perf_counter() - start) / len(points) * 1e6
+
+    start = time.perf_counter()
+    for p in points:
+        surface.evaluate(*p)
+    surface_us = (time.perf_counter() - start) / len(points) * 1e6
+
+    batch = rng.uniform(0, 100, size=(3, 100_000))
+    start = time.perf_counter()
+    surface.evaluate_batch(*batch)
+    batch_us = (time.perf_counter() - start) / batch.shape[1] * 1e6
+
+    print(f"compute():            {exact_us:9.2f} us / call")
+    print(f"surface.evaluate():   {surface_us:9.2f} us / call")
+    print(f"surface batch (100k): {batch_us:9.4f} us / point")
+
+    surface.save(args.out)
+    print("Saved", args.out)
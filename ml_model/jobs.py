@@ -0,0 +1,180 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+# =====================================================
+# ARTIFACT FINGERPRINTS
+# =====================================================
+_digest_cache = {}
+_digest_lock = threading.Lock()
+
+def file_digest(path):
+    # sha256 of the file contents, memoized on (path, mtime, size) so the
+    # multi-MB model/dataset files are only hashed again when they change
+    stat = os.stat(path)
+    stamp = (path, stat.st_mtime_ns, stat.st_size)
+
+    with _digest_lock:
+        digest = _digest_cache.get(stamp)
+    if digest is not None:
+        return digest
+
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    digest = sha.hexdigest()
+
+    with _digest_lock:
+        _digest_cache[stamp] = digest
+    return digest
+
+
+def artifact_key(*paths):
+    return hashlib.sha256("".join(file_digest(p) for p in paths).encode()).hexdigest()[:16]
+
+
+# =====================================================
+# JOB FUNCTIONS (run in worker processes)
+# =====================================================
+def compute_learning_curve(model_path, data_path):
+    # Imports stay local: the worker process only pays for them when a job runs
+    import joblib
+    import numpy as np
+    from sklearn.model_selection import learning_curve
+
+    from dataset import load_history
+    from models.thread_topology import (
+        encode_frame, parallel_config, positional_pipeline, resolve_topology, shared_arrays
+    )
+
+    model = joblib.load(model_path)
+
+    # Prepare features & target (same as training)
+    df = load_history(data_path)
+    df = df.drop(columns=["Datetime"])
+    X = df.drop("Hourly_Electricity_Demand", axis=1)
+    y = df["Hourly_Electricity_Demand"]
+
+    # 5 folds x 6 sizes = 30 independent fits; each worker's XGBoost gets
+    # its share of the cores and reads X/y from one shared memmap
+    topology = resolve_topology(tasks=30)
+    model = positional_pipeline(model, X.columns).set_params(model__n_jobs=topology.threads)
+
+    with shared_arrays(X=encode_frame(X), y=y.to_numpy(dtype=np.float64)) as shared, parallel_config(topology):
+        train_sizes, train_scores, val_scores = learning_curve(
+            model,
+            shared["X"],
+            shared["y"],
+            cv=5,
+            scoring="neg_mean_squared_error",
+            train_sizes=np.linspace(0.1, 1.0, 6),
+            n_jobs=topology.workers
+        )
+
+    train_rmse = np.sqrt(-train_scores.mean(axis=1))
+    val_rmse = np.sqrt(-val_scores.mean(axis=1))
+
+    return {
+        "train_sizes": train_sizes.tolist(),
+        "train_rmse": train_rmse.tolist(),
+        "val_rmse": val_rmse.tolist()
+    }
+
+
+# =====================================================
+# JOB MANAGER
+# =====================================================
+class JobManager:
+    # Runs expensive computations on a process pool. Finished results are
+    # written to result_dir as <name>-<key>.json, so a given key (e.g. a
+    # model + dataset fingerprint) is only ever computed once.
+
+    def __init__(self, result_dir, max_workers=1):
+        self.result_dir = result_dir
+        self.max_workers = max_workers
+        self._executor = None
+        self._jobs = {}          # job_id -> job record
+        self._by_key = {}        # (name, key) -> job_id of the live job
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        if self._executor is None:
+            # spawn: forking a process that already runs OpenMP threads
+            # (XGBoost) can deadlock the child
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _result_path(self, name, key):
+        return os.path.join(self.result_dir, f"{name}-{key}.json")
+
+    def load_result(self, name, key):
+        try:
+            with open(self._result_path(name, key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_result(self, name, key, result):
+        os.makedirs(self.result_dir, exist_ok=True)
+        path = self._result_path(name, key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(result, f)
+        os.replace(tmp_path, path)
+
+    def submit(self, name, key, fn, *args):
+        # Returns the live job for (name, key) if there is one, otherwise
+        # starts a new one
+        with self._lock:
+            job_id = self._by_key.get((name, key))
+            if job_id is not None and self._jobs[job_id]["status"] == "running":
+                return self._jobs[job_id]
+
+            job_id = uuid.uuid4().hex
+            job = {"job_id": job_id, "name": name, "key": key, "status": "running"}
+            self._jobs[job_id] = job
+            self._by_key[(name, key)] = job_id
+
+        try:
+            try:
+                future = self._pool().submit(fn, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM); start a fresh pool and retry once
+                self._executor = None
+                future = self._pool().submit(fn, *args)
+        except Exception as e:
+            with self._lock:
+                job["status"] = "failed"
+                job["error"] = str(e)
+            return job
+
+        future.add_done_callback(lambda f: self._finish(job, f))
+        return job
+
+    def _finish(self, job, future):
+        try:
+            result = future.result()
+            self._save_result(job["name"], job["key"], result)
+        except Exception as e:
+            with self._lock:
+                job["status"] = "failed"
+                job["error"] = str(e)
+            return
+
+        with self._lock:
+            job["status"] = "done"
+
+    def status(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
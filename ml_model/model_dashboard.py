@@ -1,6 +1,4 @@
-import numpy as np
-import skfuzzy as fuzz
-import skfuzzy.control as ctrl
+import os
 from flask import Flask
 import dash
 from dash import dcc, html
@@ -9,98 +7,36 @@ import plotly.graph_objs as go
 import random
 import datetime
 
+from fuzzy_controller import load_or_compile
+from ring_buffer import RingBuffer
+
 # Flask app
 server = Flask(__name__)
 
 # Dash app
 app = dash.Dash(__name__, server=server, routes_pathname_prefix='/')
 
-# Define fuzzy logic variables
-energy_demand = ctrl.Antecedent(np.arange(0, 101, 1), 'energy_demand')
-available_power = ctrl.Antecedent(np.arange(0, 101, 1), 'available_power')
-grid_load = ctrl.Antecedent(np.arange(0, 101, 1), 'grid_load')
-power_adjustment = ctrl.Consequent(np.arange(-50, 51, 1), 'power_adjustment')
-
-# Membership functions
-energy_demand.automf(3)
-available_power.automf(3)
-grid_load.automf(3)
-
-power_adjustment['decrease'] = fuzz.trimf(power_adjustment.universe, [-50, -25, 0])
-power_adjustment['maintain'] = fuzz.trimf(power_adjustment.universe, [-10, 0, 10])
-power_adjustment['increase'] = fuzz.trimf(power_adjustment.universe, [0, 25, 50])
-
-# Define fuzzy rules
-rule1 = ctrl.Rule(energy_demand['good'] | available_power['poor'] | grid_load['good'], power_adjustment['increase'])
-rule2 = ctrl.Rule(energy_demand['average'] | available_power['average'] | grid_load['average'], power_adjustment['maintain'])
-rule3 = ctrl.Rule(energy_demand['poor'] | available_power['good'] | grid_load['poor'], power_adjustment['decrease'])
-
-# Control system
-power_ctrl = ctrl.ControlSystem([rule1, rule2, rule3])
-power_sim = ctrl.ControlSystemSimulation(power_ctrl)
-
-# History buffer
-history = []
-
-# Dash layout with updated theme
-app.layout = html.Div(style={
-    'backgroundColor': '#FFFFFF',
-    'padding': '30px',
-    'fontFamily': 'Segoe UI, sans-serif'
-}, children=[
-    html.H1("Smart Grid Power Forecast Dashboard", style={
-        'textAlign': 'center',
-        'color': '#333333',
-        'fontSize': '36px',
-        'marginBottom': '10px'
-    }),
-
-    html.Div("Live simulation of Energy Demand, Available Power, Grid Load, and Predicted Adjustment.",
-             style={'textAlign': 'center', 'color': '#666666', 'marginBottom': '30px'}),
-
-    dcc.Graph(id='live-update-graph'),
-
-    dcc.Interval(
-        id='interval-component',
-        interval=5000,  # 5 seconds
-        n_intervals=0
-    )
-])
+# Fuzzy controller: precompiled lookup surface (see fuzzy_controller.py)
+power_surface = load_or_compile()
 
-# Callback for updating the graph
-@app.callback(Output('live-update-graph', 'figure'), [Input('interval-component', 'n_intervals')])
-def update_graph(n):
-    global history
+# Points kept on the live graph (server history and client-side maxPoints)
+WINDOW = int(os.environ.get("DASHBOARD_WINDOW", 20))
 
-    # Generate simulated values
-    ed = random.randint(0, 100)
-    aps = random.randint(0, 100)
-    gl = random.randint(0, 100)
+# History buffer: fixed-size ring, trace order of the figure below
+SERIES = ['energy_demand', 'available_power', 'grid_load', 'adjustment']
+history = RingBuffer(WINDOW, {'time': 'U8', **{name: float for name in SERIES}})
 
-    power_sim.input['energy_demand'] = ed
-    power_sim.input['available_power'] = aps
-    power_sim.input['grid_load'] = gl
-    power_sim.compute()
-    adjustment = round(power_sim.output['power_adjustment'], 2)
 
-    timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-
-    history.append({
-        'time': timestamp,
-        'energy_demand': ed,
-        'available_power': aps,
-        'grid_load': gl,
-        'adjustment': adjustment
-    })
-
-    if len(history) > 20:
-        history = history[-20:]  # keep last 100 for smoothness
+def build_figure():
+    # Full figure, built once per page load from the buffered history;
+    # afterwards the interval callback only sends new points
+    snapshot = {name: values.tolist() for name, values in history.snapshot().items()}
 
     fig = go.Figure()
 
     fig.add_trace(go.Scatter(
-        x=[h['time'] for h in history],
-        y=[h['energy_demand'] for h in history],
+        x=snapshot['time'],
+        y=snapshot['energy_demand'],
         mode='lines+markers',
         name='Energy Demand',
         line=dict(color='#4A90E2', width=2),
@@ -108,8 +44,8 @@ def update_graph(n):
     ))
 
     fig.add_trace(go.Scatter(
-        x=[h['time'] for h in history],
-        y=[h['available_power'] for h in history],
+        x=snapshot['time'],
+        y=snapshot['available_power'],
         mode='lines+markers',
         name='Available Power',
         line=dict(color='#50E3C2', width=2),
@@ -117,8 +53,8 @@ def update_graph(n):
     ))
 
     fig.add_trace(go.Scatter(
-        x=[h['time'] for h in history],
-        y=[h['grid_load'] for h in history],
+        x=snapshot['time'],
+        y=snapshot['grid_load'],
         mode='lines+markers',
         name='Grid Load',
         line=dict(color='#F5A623', width=2),
@@ -126,8 +62,8 @@ def update_graph(n):
     ))
 
     fig.add_trace(go.Scatter(
-        x=[h['time'] for h in history],
-        y=[h['adjustment'] for h in history],
+        x=snapshot['time'],
+        y=snapshot['adjustment'],
         mode='lines+markers',
         name='Power Adjustment',
         line=dict(color='#D0021B', width=3, dash='dash'),
@@ -150,11 +86,67 @@ def update_graph(n):
         yaxis=dict(showgrid=True, gridcolor='rgba(0,0,0,0.05)'),
         hovermode='x unified',
         margin=dict(t=60, l=60, r=30, b=60),
-        legend=dict(bgcolor='#FFFFFF', bordercolor='lightgray')
+        legend=dict(bgcolor='#FFFFFF', bordercolor='lightgray'),
+        uirevision='live'   # keep zoom / rangeslider across updates
     )
 
     return fig
 
+
+# Dash layout with updated theme (a function: each page load gets the current history)
+def serve_layout():
+    return html.Div(style={
+        'backgroundColor': '#FFFFFF',
+        'padding': '30px',
+        'fontFamily': 'Segoe UI, sans-serif'
+    }, children=[
+        html.H1("Smart Grid Power Forecast Dashboard", style={
+            'textAlign': 'center',
+            'color': '#333333',
+            'fontSize': '36px',
+            'marginBottom': '10px'
+        }),
+
+        html.Div("Live simulation of Energy Demand, Available Power, Grid Load, and Predicted Adjustment.",
+                 style={'textAlign': 'center', 'color': '#666666', 'marginBottom': '30px'}),
+
+        dcc.Graph(id='live-update-graph', figure=build_figure()),
+
+        dcc.Interval(
+            id='interval-component',
+            interval=5000,  # 5 seconds
+            n_intervals=0
+        )
+    ])
+
+
+app.layout = serve_layout
+
+# Callback for updating the graph: appends one point per trace
+@app.callback(Output('live-update-graph', 'extendData'), [Input('interval-component', 'n_intervals')])
+def update_graph(n):
+    # Generate simulated values
+    ed = random.randint(0, 100)
+    aps = random.randint(0, 100)
+    gl = random.randint(0, 100)
+
+    adjustment = round(power_surface.evaluate(ed, aps, gl), 2)
+
+    timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+
+    history.append(
+        time=timestamp,
+        energy_demand=ed,
+        available_power=aps,
+        grid_load=gl,
+        adjustment=adjustment
+    )
+
+    # Payload is one point per trace whatever the window; the browser drops
+    # points beyond WINDOW (maxPoints)
+    new_points = dict(x=[[timestamp]] * len(SERIES), y=[[ed], [aps], [gl], [adjustment]])
+    return new_points, list(range(len(SERIES))), WINDOW
+
 # Run the app
 if __name__ == '__main__':
     app.run_server(debug=True, port=8050, host='0.0.0.0')
@@ -0,0 +1,355 @@
+import argparse
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from dataset import CATEGORICAL_COLUMNS
+from fast_predict import compile_pipeline
+
+# =====================================================
+# VERSIONED MODEL REGISTRY
+# =====================================================
+# registry.json maps version names to model artifacts and records which
+# one is active. The API serves whatever `registry.active` points to; a
+# new version is loaded + warmed up in a background thread and swapped in
+# with a single reference assignment, so requests that already picked up
+# the old LoadedModel finish on it.
+#
+# The manifest is runtime state (written on register / swap), so it lives
+# in the untracked cache directory. Artifacts are unpickled with joblib:
+# only files inside MODELS_DIR can be registered or loaded.
+
+REGISTRY_PATH = "ml_model/models/cache/registry.json"
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+WARMUP_ROWS = 256
+SHADOW_SAMPLES = 1000
+MAX_SHADOW_BACKLOG = 100
+
+def model_frame(df, features):
+    # Request rows -> pipeline input: categoricals as str (a JSON number
+    # next to strings would reach the OneHotEncoder as mixed types; unknown
+    # values encode as all zeros), numerics as float with null -> NaN,
+    # which XGBoost treats as missing (as the compiled single-row path).
+    # Raises ValueError naming the column on a non-numeric value.
+    frame = {}
+    for column in features:
+        if column in CATEGORICAL_COLUMNS:
+            frame[column] = df[column].astype(str)
+            continue
+        try:
+            frame[column] = pd.to_numeric(df[column]).astype(float)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{column}: {e}") from e
+    return pd.DataFrame(frame, index=df.index)
+
+
+# Value ranges for synthetic warm-up rows (the passthrough columns of the
+# pipeline carry no statistics of their own)
+SYNTHETIC_RANGES = {
+    "Hour": (0, 23), "DayOfWeek": (0, 6), "Month": (1, 12), "IsWeekend": (0, 1),
+    "Temperature": (0.0, 45.0), "Electricity_Price": (3.0, 10.0),
+    "load_t_1": (300.0, 1500.0), "load_t_24": (300.0, 1500.0), "load_t_168": (300.0, 1500.0),
+    "rolling_mean_24": (300.0, 1500.0), "rolling_max_24": (400.0, 1800.0),
+    "rolling_std_24": (10.0, 300.0), "rolling_mean_168": (300.0, 1500.0),
+}
+
+
+def now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def read_manifest(path):
+    if not os.path.exists(path):
+        return {"active": None, "versions": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_manifest(path, manifest):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def check_artifact_path(path):
+    # joblib.load runs arbitrary pickled code: refuse anything that does
+    # not resolve (symlinks included) to a file under MODELS_DIR
+    resolved = os.path.realpath(path)
+    models_dir = os.path.realpath(MODELS_DIR)
+    if os.path.commonpath([resolved, models_dir]) != models_dir:
+        raise PermissionError(f"Model artifacts must be inside {models_dir}")
+    return resolved
+
+
+def register_version(manifest_path, version, path):
+    # Adds a version (the first one registered also becomes active)
+    check_artifact_path(path)
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"No model artifact at {path}")
+    manifest = read_manifest(manifest_path)
+    if version in manifest["versions"]:
+        raise ValueError(f"Version '{version}' is already registered")
+    manifest["versions"][version] = {"path": path, "registered": now()}
+    manifest["active"] = manifest["active"] or version
+    write_manifest(manifest_path, manifest)
+    return manifest["versions"][version]
+
+
+# =====================================================
+# ONE LOADED VERSION
+# =====================================================
+class LoadedModel:
+
+    def __init__(self, version, path):
+        self.version = version
+        self.path = path
+        self.pipeline = joblib.load(check_artifact_path(path))
+        # Compiled single-row / column path (None -> pipeline.predict)
+        self.fast = compile_pipeline(self.pipeline)
+        self.features = list(self.pipeline.named_steps["preprocessor"].feature_names_in_)
+        self.warmup = None
+
+    def predict_one(self, data):
+        if self.fast is not None:
+            return self.fast.predict_one(data)
+        return float(self.predict_frame(model_frame(pd.DataFrame([data]), self.features))[0])
+
+    def predict_frame(self, df):
+        return self.pipeline.predict(df[self.features]).astype(float)
+
+    def predict_columns(self, columns, n_rows):
+        if self.fast is not None:
+            return self.fast.predict_columns(columns, n_rows)
+        return self.predict_frame(pd.DataFrame(columns))
+
+    def synthetic_rows(self, n, seed=0):
+        rng = np.random.default_rng(seed)
+        columns = {}
+        for _, transformer, names in self.pipeline.named_steps["preprocessor"].transformers_:
+            for column, categories in zip(names, getattr(transformer, "categories_", [])):
+                columns[column] = rng.choice(categories, n)
+
+        for column in self.features:
+            if column in columns:
+                continue
+            lo, hi = SYNTHETIC_RANGES.get(column, (0.0, 1.0))
+            if isinstance(lo, int):
+                columns[column] = rng.integers(lo, hi + 1, n)
+            else:
+                columns[column] = rng.uniform(lo, hi, n)
+        return pd.DataFrame(columns)[self.features]
+
+    def warm_up(self, n=WARMUP_ROWS):
+        # First calls pay for lazy allocations (booster buffers, per-thread
+        # row buffers); take that hit here instead of on live traffic
+        df = self.synthetic_rows(n)
+        self.predict_frame(df)
+
+        timings = []
+        for row in df.to_dict(orient="records"):
+            start = time.perf_counter()
+            self.predict_one(row)
+            timings.append(time.perf_counter() - start)
+
+        p50, p99 = np.percentile(np.array(timings) * 1e6, [50, 99])
+        self.warmup = {"rows": n, "single_row_p50_us": round(p50, 1), "single_row_p99_us": round(p99, 1)}
+        return self.warmup
+
+
+# =====================================================
+# SHADOW SCORING
+# =====================================================
+class ShadowScorer:
+    # Re-scores live inputs with a candidate off the request path and keeps
+    # bounded latency / disagreement samples for both models
+
+    def __init__(self, candidate):
+        self.candidate = candidate
+        self.started = now()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        self._samples = deque(maxlen=SHADOW_SAMPLES)   # (rows, active s, candidate s, mean |diff|)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.dropped = 0
+
+    def submit(self, score, active_seconds, active_predictions, rows):
+        # score(candidate) -> predictions; skipped when the candidate lags behind
+        with self._lock:
+            if self._pending >= MAX_SHADOW_BACKLOG:
+                self.dropped += 1
+                return
+            self._pending += 1
+        self._executor.submit(self._run, score, active_seconds, np.asarray(active_predictions, dtype=float), rows)
+
+    def _run(self, score, active_seconds, active_predictions, rows):
+        try:
+            start = time.perf_counter()
+            predictions = np.asarray(score(self.candidate), dtype=float)
+            elapsed = time.perf_counter() - start
+            diff = float(np.mean(np.abs(predictions - active_predictions)))
+            with self._lock:
+                self._samples.append((rows, active_seconds, elapsed, diff))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stop(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def report(self):
+        with self._lock:
+            samples = np.array(self._samples, dtype=float).reshape(-1, 4)
+
+        def latency(column):
+            if not len(samples):
+                return None
+            p50, p95 = np.percentile(samples[:, column] * 1e3, [50, 95])
+            return {"p50_ms": round(p50, 3), "p95_ms": round(p95, 3)}
+
+        return {
+            "version": self.candidate.version,
+            "started": self.started,
+            "requests": len(samples),
+            "dropped": self.dropped,
+            "active_latency": latency(1),
+            "candidate_latency": latency(2),
+            "mean_abs_diff": round(float(samples[:, 3].mean()), 4) if len(samples) else None
+        }
+
+
+# =====================================================
+# REGISTRY
+# =====================================================
+class ModelRegistry:
+
+    def __init__(self, manifest_path=REGISTRY_PATH, default_path=None):
+        self.manifest_path = manifest_path
+        self._lock = threading.Lock()
+        self.tasks = {}            # version -> background load status
+        self.shadow = None
+
+        manifest = read_manifest(manifest_path)
+        if not manifest["versions"] and default_path:
+            register_version(manifest_path, "v1", default_path)
+            manifest = read_manifest(manifest_path)
+
+        self.active = LoadedModel(manifest["active"], manifest["versions"][manifest["active"]]["path"])
+        self.active.warm_up()
+        self.active_since = now()
+
+    # ---------------- manifest ----------------
+    def versions(self):
+        return read_manifest(self.manifest_path)["versions"]
+
+    def register(self, version, path):
+        with self._lock:
+            return register_version(self.manifest_path, version, path)
+
+    # ---------------- load / swap ----------------
+    def deploy(self, version, mode="activate"):
+        # mode: "activate" (swap in once warm) or "shadow" (score alongside)
+        versions = self.versions()
+        if version not in versions:
+            raise KeyError(version)
+
+        with self._lock:
+            task = self.tasks.get(version)
+            if task is not None and task["status"] == "loading":
+                return task
+            task = self.tasks[version] = {"version": version, "mode": mode, "status": "loading", "started": now()}
+
+        thread = threading.Thread(
+            target=self._load, args=(task, versions[version]["path"]),
+            name=f"model-load-{version}", daemon=True
+        )
+        thread.start()
+        return task
+
+    def _load(self, task, path):
+        try:
+            start = time.perf_counter()
+            candidate = LoadedModel(task["version"], path)
+            task["load_seconds"] = round(time.perf_counter() - start, 3)
+            task["warmup"] = candidate.warm_up()
+
+            if task["mode"] == "shadow":
+                self.start_shadow(candidate)
+            else:
+                self.swap(candidate)
+            task["status"] = "done"
+        except Exception as e:
+            task["status"] = "failed"
+            task["error"] = str(e)
+        task["finished"] = now()
+
+    def swap(self, candidate):
+        with self._lock:
+            manifest = read_manifest(self.manifest_path)
+            manifest["active"] = candidate.version
+            write_manifest(self.manifest_path, manifest)
+            # Single reference assignment: requests holding the old model
+            # keep using it; new requests get the candidate
+            self.active = candidate
+            self.active_since = now()
+        if self.shadow is not None and self.shadow.candidate.version == candidate.version:
+            self.stop_shadow()
+
+    def start_shadow(self, candidate):
+        with self._lock:
+            previous, self.shadow = self.shadow, ShadowScorer(candidate)
+        if previous is not None:
+            previous.stop()
+
+    def stop_shadow(self):
+        with self._lock:
+            previous, self.shadow = self.shadow, None
+        if previous is not None:
+            previous.stop()
+        return previous
+
+    def shadow_score(self, score, active_seconds, active_predictions, rows=1):
+        shadow = self.shadow
+        if shadow is not None:
+            shadow.submit(score, active_seconds, active_predictions, rows)
+
+    def status(self):
+        active = self.active
+        shadow = self.shadow
+        return {
+            "active": {
+                "version": active.version,
+                "path": active.path,
+                "since": self.active_since,
+                "compiled": active.fast is not None,
+                "warmup": active.warmup
+            },
+            "versions": self.versions(),
+            "tasks": list(self.tasks.values()),
+            "shadow": None if shadow is None else shadow.report()
+        }
+
+
+# =====================================================
+# REGISTER AN ARTIFACT FROM THE COMMAND LINE
+# =====================================================
+# python ml_model/model_registry.py ml_model/models/my_model.pkl --version v2
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Register a model artifact")
+    parser.add_argument("path")
+    parser.add_argument("--version", default=None, help="defaults to a UTC timestamp")
+    parser.add_argument("--registry", default=REGISTRY_PATH)
+    args = parser.parse_args()
+
+    version = args.version or datetime.now(timezone.utc).strftime("v%Y%m%d%H%M%S")
+    register_version(args.registry, version, args.path)
+    print(f"Registered {version} -> {args.path}")
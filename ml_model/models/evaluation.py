@@ -0,0 +1,107 @@
+import os
+
+import numpy as np
+
+# =====================================================
+# HOLDOUT EVALUATION ARTIFACT
+# =====================================================
+# Written next to the model .pkl by power_demand_model.py so the API can
+# serve real holdout numbers without re-scoring the test set per request.
+
+RISK_LEVELS = ["NORMAL", "HIGH", "CRITICAL"]
+METRIC_NAMES = ["MAE", "RMSE", "R2", "SMAPE"]
+
+
+def evaluation_path(model_path):
+    return os.path.splitext(model_path)[0] + "_evaluation.npz"
+
+
+def risk_class(values, p90, p95):
+    # 0 = NORMAL, 1 = HIGH, 2 = CRITICAL
+    values = np.asarray(values, dtype=float)
+    return (values >= p90).astype(np.int8) + (values >= p95).astype(np.int8)
+
+
+def build_evaluation(times, hours, y_true, y_pred, p90, p95):
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    hours = np.asarray(hours, dtype=np.int64)
+    error = y_pred - y_true
+
+    # ---------------- metrics ----------------
+    mae = np.mean(np.abs(error))
+    rmse = np.sqrt(np.mean(error ** 2))
+    r2 = 1.0 - np.sum(error ** 2) / np.sum((y_true - y_true.mean()) ** 2)
+    smape = np.mean(2 * np.abs(error) / (np.abs(y_true) + np.abs(y_pred))) * 100
+
+    # ---------------- residuals by hour ----------------
+    counts = np.bincount(hours, minlength=24)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        residual_mean = np.bincount(hours, weights=error, minlength=24) / counts
+        residual_mae = np.bincount(hours, weights=np.abs(error), minlength=24) / counts
+
+    # ---------------- peak-class confusion ----------------
+    actual_class = risk_class(y_true, p90, p95)
+    predicted_class = risk_class(y_pred, p90, p95)
+    confusion = np.bincount(actual_class * 3 + predicted_class, minlength=9).reshape(3, 3)
+
+    return {
+        "time": np.asarray(times, dtype="datetime64[s]"),
+        "actual": y_true.astype(np.float32),
+        "predicted": y_pred.astype(np.float32),
+        "metrics": np.array([mae, rmse, r2, smape]),
+        "residual_count": counts,
+        "residual_mean": residual_mean,
+        "residual_mae": residual_mae,
+        "confusion": confusion,
+        "thresholds": np.array([p90, p95]),
+    }
+
+
+def save_evaluation(path, evaluation):
+    np.savez_compressed(path, **evaluation)
+
+
+def load_evaluation(path):
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+# =====================================================
+# REBUILD FROM AN EXISTING MODEL
+# =====================================================
+# python ml_model/models/evaluation.py
+# Uses the same time-aware 80/20 split as power_demand_model.py.
+if __name__ == "__main__":
+    import sys
+
+    import joblib
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from dataset import load_history
+
+    MODEL_PATH = "ml_model/models/final_electricity_demand_model.pkl"
+    DATA_PATH = "ml_model/data/electricity_demand_with_history.csv"
+    TARGET = "Hourly_Electricity_Demand"
+
+    model = joblib.load(MODEL_PATH)
+
+    df = load_history(DATA_PATH)
+    df = df.sort_values("Datetime").reset_index(drop=True)
+
+    split_idx = int(len(df) * 0.8)
+    train, test = df.iloc[:split_idx], df.iloc[split_idx:]
+
+    X_test = test.drop(columns=["Datetime", TARGET])
+    evaluation = build_evaluation(
+        test["Datetime"].to_numpy(),
+        test["Hour"].to_numpy(),
+        test[TARGET].to_numpy(),
+        model.predict(X_test),
+        np.percentile(train[TARGET], 90),
+        np.percentile(train[TARGET], 95)
+    )
+
+    save_evaluation(evaluation_path(MODEL_PATH), evaluation)
+    print("Saved", evaluation_path(MODEL_PATH))
+    print(dict(zip(METRIC_NAMES, np.round(evaluation["metrics"], 3).tolist())))
@@ -0,0 +1,134 @@
+import time
+
+import numpy as np
+import xgboost as xgb
+from joblib import Parallel, delayed
+from sklearn.model_selection import ParameterSampler
+
+from thread_topology import Topology, available_cores
+
+# =====================================================
+# FAST HYPERPARAMETER SEARCH
+# =====================================================
+# Same candidates and TimeSeriesSplit folds as the RandomizedSearchCV in
+# power_demand_model.py, but:
+#   * the one-hot ColumnTransformer runs once; every fold is a slice of
+#     that matrix, quantized into an XGBoost QuantileDMatrix once and
+#     reused by every candidate
+#   * n_estimators is only a cap: each fit early-stops on its fold's
+#     validation slice
+#   * successive halving: all candidates see the first (cheapest) folds,
+#     only the best 1/eta go on to the next rung of folds
+#   * the fits of a rung run on `topology.workers` threads (XGBoost drops
+#     the GIL while training, and threads share the cached DMatrix
+#     objects), each with `topology.threads` XGBoost threads
+
+EARLY_STOPPING_ROUNDS = 50
+
+
+def xgb_params(candidate, seed=42, nthread=None):
+    # "model__max_depth" -> native xgboost parameter names
+    params = {
+        "objective": "reg:squarederror",
+        "tree_method": "hist",
+        "eval_metric": "rmse",
+        "seed": seed,
+    }
+    if nthread:
+        params["nthread"] = nthread
+    for name, value in candidate.items():
+        name = name.replace("model__", "")
+        if name == "n_estimators":
+            continue
+        params["eta" if name == "learning_rate" else name] = value
+    return params
+
+
+class FoldCache:
+    # Train/validation DMatrix per fold, built once
+
+    def __init__(self, matrix, y, folds):
+        y = np.asarray(y, dtype=np.float32)
+        self.folds = []
+        for train_idx, val_idx in folds:
+            train = xgb.QuantileDMatrix(matrix[train_idx], y[train_idx])
+            val = xgb.QuantileDMatrix(matrix[val_idx], y[val_idx], ref=train)
+            self.folds.append((train, val))
+
+    def __len__(self):
+        return len(self.folds)
+
+    def score(self, candidate, fold, early_stopping_rounds=EARLY_STOPPING_ROUNDS, nthread=None):
+        # -> (validation RMSE at the best iteration, trees used)
+        train, val = self.folds[fold]
+        booster = xgb.train(
+            xgb_params(candidate, nthread=nthread),
+            train,
+            num_boost_round=candidate["model__n_estimators"],
+            evals=[(val, "val")],
+            early_stopping_rounds=early_stopping_rounds,
+            verbose_eval=False
+        )
+        return float(booster.best_score), booster.best_iteration + 1
+
+
+def halving_rungs(n_folds, eta):
+    # Fold indices added at each rung: 1, eta, eta^2 ... folds per rung
+    # (cheapest, earliest folds first), the last rung takes the rest
+    rungs, start, size = [], 0, 1
+    while start < n_folds:
+        rungs.append(list(range(start, min(start + size, n_folds))))
+        start += size
+        size *= eta
+    return rungs
+
+
+def fast_search(matrix, y, folds, param_grid, n_iter=25, eta=3, halving=True,
+                random_state=42, early_stopping_rounds=EARLY_STOPPING_ROUNDS, topology=None,
+                verbose=True):
+    start = time.perf_counter()
+    topology = topology or Topology(1, available_cores())
+    candidates = list(ParameterSampler(param_grid, n_iter=n_iter, random_state=random_state))
+
+    cache = FoldCache(matrix, y, folds)
+    rungs = halving_rungs(len(cache), eta) if halving else [list(range(len(cache)))]
+
+    scores = {i: [] for i in range(len(candidates))}     # candidate -> [(rmse, trees)]
+    alive = list(range(len(candidates)))
+    fits = 0
+
+    for r, rung in enumerate(rungs):
+        tasks = [(i, fold) for i in alive for fold in rung]
+        results = Parallel(n_jobs=topology.workers, prefer="threads")(
+            delayed(cache.score)(candidates[i], fold, early_stopping_rounds, topology.threads)
+            for i, fold in tasks
+        )
+        for (i, _), result in zip(tasks, results):
+            scores[i].append(result)
+        fits += len(tasks)
+
+        ranked = sorted(alive, key=lambda i: np.mean([s for s, _ in scores[i]]))
+        if verbose:
+            best = np.mean([s for s, _ in scores[ranked[0]]])
+            print(f"  rung {r}: {len(alive)} candidates x folds {rung} -> best CV RMSE {best:.3f}")
+        if r < len(rungs) - 1:
+            alive = ranked[:max(1, int(np.ceil(len(alive) / eta)))]
+        else:
+            alive = ranked
+
+    best = alive[0]
+    rmse = [s for s, _ in scores[best]]
+    trees = [t for _, t in scores[best]]
+
+    best_params = dict(candidates[best])
+    # Refit size: what early stopping picked on the folds this candidate ran
+    best_params["model__n_estimators"] = int(np.ceil(np.median(trees)))
+
+    return {
+        "best_params": best_params,
+        "cv_rmse": float(np.mean(rmse)),
+        "candidates": len(candidates),
+        "fits": fits,
+        "topology": "%dx%d" % topology,
+        "seconds": time.perf_counter() - start,
+    }
@@ -0,0 +1,190 @@
+import copy
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import mean_squared_error
+from sklearn.pipeline import Pipeline
+
+# =====================================================
+# WARM-START INCREMENTAL RETRAINING
+# =====================================================
+# A full training run writes <model>_training.json next to the .pkl: the
+# watermark (last timestamp the build saw, holdout included), the holdout
+# range, the chosen hyperparameters, the encoder categories and reference
+# statistics of the training data.
+# An incremental run only reads rows after the watermark and keeps
+# boosting the existing XGBoost model on them, reusing the fitted
+# encoder. It asks for a full rebuild instead when the new rows do not
+# fit the old model: unseen categories, shifted inputs, a large error
+# increase, or too many trees added since the last full build.
+
+DRIFT_COLUMNS = ["Temperature", "Electricity_Price"]
+DRIFT_THRESHOLD = 2.0          # |mean shift| in reference standard deviations
+ERROR_RATIO_THRESHOLD = 1.5    # RMSE on the new rows vs holdout RMSE of the full build
+MAX_TREE_GROWTH = 2.0          # total trees vs trees of the full build
+MIN_NEW_ROWS = 168
+MAX_ROUNDS = 100
+EARLY_STOPPING_ROUNDS = 10
+VALIDATION_FRACTION = 0.2
+
+
+def metadata_path(model_path):
+    return os.path.splitext(model_path)[0] + "_training.json"
+
+
+def load_metadata(model_path):
+    try:
+        with open(metadata_path(model_path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_metadata(model_path, metadata):
+    path = metadata_path(model_path)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def reference_stats(X, y):
+    stats = {name: X[name] for name in DRIFT_COLUMNS if name in X.columns}
+    stats["target"] = y
+    return {name: {"mean": float(values.mean()), "std": float(values.std())} for name, values in stats.items()}
+
+
+def build_metadata(pipeline, X_train, y_train, watermark, holdout, best_params, holdout_rmse):
+    # Written by a full training run (power_demand_model.py)
+    preprocessor = pipeline.named_steps["preprocessor"]
+    encoder = preprocessor.named_transformers_["cat"]
+    trees = pipeline.named_steps["model"].get_booster().num_boosted_rounds()
+    return {
+        "watermark": str(pd.Timestamp(watermark)),
+        "holdout": {"start": str(pd.Timestamp(holdout[0])), "end": str(pd.Timestamp(holdout[1]))},
+        "rows": int(len(X_train)),
+        "features": list(preprocessor.feature_names_in_),
+        "best_params": {name: value.item() if hasattr(value, "item") else value
+                        for name, value in best_params.items()},
+        "categories": {column: [str(c) for c in categories]
+                       for column, categories in zip(encoder.feature_names_in_, encoder.categories_)},
+        "reference": reference_stats(X_train, y_train),
+        "holdout_rmse": float(holdout_rmse),
+        "full_build_trees": int(trees),
+        "trees": int(trees),
+        "history": [{"kind": "full", "at": now(), "rows": int(len(X_train)), "watermark": str(pd.Timestamp(watermark))}]
+    }
+
+
+# =====================================================
+# REBUILD CHECKS
+# =====================================================
+def rebuild_reasons(metadata, pipeline, X_new, y_new):
+    # Empty list -> the new rows can be absorbed incrementally
+    reasons = []
+    if list(X_new.columns) != metadata["features"]:
+        return ["feature columns changed"]
+
+    for column, known in metadata["categories"].items():
+        unseen = sorted(set(X_new[column].astype(str)) - set(known))
+        if unseen:
+            reasons.append(f"new {column} values: {', '.join(unseen)}")
+
+    current = reference_stats(X_new, y_new)
+    for name, ref in metadata["reference"].items():
+        if ref["std"] > 0:
+            shift = abs(current[name]["mean"] - ref["mean"]) / ref["std"]
+            if shift > DRIFT_THRESHOLD:
+                reasons.append(f"{name} mean moved {shift:.1f} std from the training data")
+
+    if not reasons:
+        # Only meaningful when the encoder knows every category
+        rmse = np.sqrt(mean_squared_error(y_new, pipeline.predict(X_new)))
+        ratio = rmse / metadata["holdout_rmse"]
+        if ratio > ERROR_RATIO_THRESHOLD:
+            reasons.append(f"RMSE on new rows is {ratio:.2f}x the holdout RMSE ({rmse:.1f})")
+
+    if metadata["trees"] > MAX_TREE_GROWTH * metadata["full_build_trees"]:
+        reasons.append(f"model has grown to {metadata['trees']} trees")
+    return reasons
+
+
+# =====================================================
+# CONTINUED BOOSTING
+# =====================================================
+def continue_boosting(pipeline, X_new, y_new, best_params, max_rounds=MAX_ROUNDS):
+    # Returns (updated pipeline, trees added). The number of extra rounds is
+    # picked by early stopping on the latest VALIDATION_FRACTION of the new
+    # rows, then the rounds are boosted on all of them. 0 trees added means
+    # extra rounds did not help; the pipeline is returned unchanged.
+    preprocessor = pipeline.named_steps["preprocessor"]
+    regressor = pipeline.named_steps["model"]
+    booster = regressor.get_booster()
+    trees = booster.num_boosted_rounds()
+
+    # Fitted encoder: transform only, categories stay as trained
+    matrix = preprocessor.transform(X_new)
+    target = np.asarray(y_new, dtype=np.float64)
+    params = {name.replace("model__", ""): value for name, value in best_params.items()
+              if name != "model__n_estimators"}
+
+    split = int(len(matrix) * (1 - VALIDATION_FRACTION))
+    probe = clone(regressor).set_params(
+        n_estimators=max_rounds, early_stopping_rounds=EARLY_STOPPING_ROUNDS, **params
+    )
+    probe.fit(matrix[:split], target[:split], eval_set=[(matrix[split:], target[split:])],
+              xgb_model=booster, verbose=False)
+    added = probe.best_iteration + 1 - trees
+    if added <= 0:
+        return pipeline, 0
+
+    updated = clone(regressor).set_params(n_estimators=added, **params)
+    updated.fit(matrix, target, xgb_model=booster)
+
+    return Pipeline(steps=[("preprocessor", preprocessor), ("model", updated)]), added
+
+
+def incremental_update(pipeline, metadata, X, y, times, min_new_rows=MIN_NEW_ROWS, max_rounds=MAX_ROUNDS):
+    # -> (pipeline or None, metadata to save or None, outcome); outcome
+    # "status" is "updated", "unchanged", "deferred" or "rebuild"
+    if metadata is None:
+        return None, None, {"status": "rebuild", "reasons": ["no training metadata next to the model"]}
+    if "holdout" not in metadata:
+        # Older metadata put the watermark at the end of the training split
+        return None, None, {"status": "rebuild", "reasons": ["training metadata has no holdout range"]}
+
+    watermark = pd.Timestamp(metadata["watermark"])
+    times = pd.to_datetime(pd.Series(times))
+    new = (times > watermark).to_numpy()
+    outcome = {"watermark": str(watermark), "new_rows": int(new.sum())}
+
+    if outcome["new_rows"] < min_new_rows:
+        # Rows stay behind the watermark and are picked up next time
+        return None, None, dict(outcome, status="deferred")
+
+    X_new, y_new = X[new], y[new]
+    reasons = rebuild_reasons(metadata, pipeline, X_new, y_new)
+    if reasons:
+        return None, None, dict(outcome, status="rebuild", reasons=reasons)
+
+    updated, added = continue_boosting(pipeline, X_new, y_new, metadata["best_params"], max_rounds)
+
+    latest = str(times[new].max())
+    metadata = copy.deepcopy(metadata)
+    metadata["watermark"] = latest
+    metadata["rows"] += outcome["new_rows"]
+    metadata["trees"] += added
+    metadata["history"].append({
+        "kind": "incremental", "at": now(), "rows": outcome["new_rows"],
+        "trees_added": added, "watermark": latest
+    })
+    status = "updated" if added else "unchanged"
+    return updated, metadata, dict(outcome, status=status, trees_added=added)
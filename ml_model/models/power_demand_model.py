@@ -54,6 +54,11 @@
 # joblib.dump(label_encoders, 'label_encoders.pkl')
 
 # print("Model and encoders saved successfully.")
+import argparse
+import os
+import sys
+import time
+
 import pandas as pd
 import numpy as np
 import joblib
@@ -66,60 +71,18 @@ from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
 from xgboost import XGBRegressor
 
-# =====================================================
-# 1. LOAD DATA
-# =====================================================
-df = pd.read_csv("ml_model/data/electricity_demand_with_history.csv")
+from evaluation import build_evaluation, evaluation_path, load_evaluation, save_evaluation
+from fast_search import fast_search
+from incremental import MAX_ROUNDS, MIN_NEW_ROWS, build_metadata, incremental_update, load_metadata, save_metadata
+from thread_topology import encode_frame, parallel_config, positional_pipeline, resolve_topology, shared_arrays
 
-df['Datetime'] = pd.to_datetime(df['Datetime'])
-df = df.sort_values('Datetime').reset_index(drop=True)
-datetime_series = df["Datetime"].copy()
-df = df.drop(columns=["Datetime"])
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dataset import load_history
 
-# =====================================================
-# 2. DEFINE TARGET
-# =====================================================
+MODEL_PATH = "ml_model/models/final_electricity_demand_model.pkl"
+DATA_PATH = "ml_model/data/electricity_demand_with_history.csv"
 TARGET = "Hourly_Electricity_Demand"
 
-X = df.drop(TARGET, axis=1)
-y = df[TARGET]
-
-# =====================================================
-# 3. FEATURE TYPES
-# =====================================================
-categorical_cols = X.select_dtypes(include=["object"]).columns
-numerical_cols = X.select_dtypes(exclude=["object"]).columns
-
-# =====================================================
-# 4. PREPROCESSING
-# =====================================================
-preprocessor = ColumnTransformer(
-    transformers=[
-        ("cat", OneHotEncoder(handle_unknown="ignore", sparse_output=False), categorical_cols),
-        ("num", "passthrough", numerical_cols)
-    ]
-)
-
-# =====================================================
-# 5. MODEL
-# =====================================================
-xgb = XGBRegressor(
-    objective="reg:squarederror",
-    tree_method="hist",
-    eval_metric="rmse",
-    random_state=42
-)
-
-pipeline = Pipeline(steps=[
-    ("preprocessor", preprocessor),
-    ("model", xgb)
-])
-
-# =====================================================
-# 6. TIME SERIES CROSS VALIDATION
-# =====================================================
-tscv = TimeSeriesSplit(n_splits=5)
-
 param_grid = {
     "model__n_estimators": [600, 800, 1000],
     "model__learning_rate": [0.03, 0.05, 0.1],
@@ -128,93 +91,305 @@ param_grid = {
     "model__colsample_bytree": [0.8, 1.0]
 }
 
-search = RandomizedSearchCV(
-    pipeline,
-    param_distributions=param_grid,
-    n_iter=25,
-    scoring="neg_root_mean_squared_error",
-    cv=tscv,
-    n_jobs=-1,
-    verbose=1,
-    random_state=42
-)
 
 # =====================================================
-# 7. TRAIN / TEST SPLIT (TIME AWARE)
+# 1. LOAD DATA
 # =====================================================
-split_idx = int(len(X) * 0.8)
-
-X_train, X_test = X.iloc[:split_idx], X.iloc[split_idx:]
-y_train, y_test = y.iloc[:split_idx], y.iloc[split_idx:]
+def load_data(data_path=DATA_PATH, filters=None):
+    df = load_history(data_path, filters=filters)
 
-# =====================================================
-# 8. TRAIN MODEL
-# =====================================================
-search.fit(X_train, y_train)
-best_model = search.best_estimator_
+    df = df.sort_values('Datetime').reset_index(drop=True)
+    datetime_series = df["Datetime"].copy()
+    df = df.drop(columns=["Datetime"])
 
-print("\n✅ Best Hyperparameters:")
-print(search.best_params_)
+    # =====================================================
+    # 2. DEFINE TARGET
+    # =====================================================
+    X = df.drop(TARGET, axis=1)
+    y = df[TARGET]
+    return X, y, datetime_series
 
-# =====================================================
-# 9. PREDICTION
-# =====================================================
-y_pred = best_model.predict(X_test)
 
 # =====================================================
-# 10. EVALUATION
+# 3. FEATURE TYPES + 4. PREPROCESSING + 5. MODEL
 # =====================================================
-mae = mean_absolute_error(y_test, y_pred)
-rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-r2 = r2_score(y_test, y_pred)
+def build_pipeline(X, **model_params):
+    categorical_cols = X.select_dtypes(include=["object", "category"]).columns
+    numerical_cols = X.select_dtypes(exclude=["object", "category"]).columns
+
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ("cat", OneHotEncoder(handle_unknown="ignore", sparse_output=False), categorical_cols),
+            ("num", "passthrough", numerical_cols)
+        ]
+    )
+
+    xgb = XGBRegressor(
+        objective="reg:squarederror",
+        tree_method="hist",
+        eval_metric="rmse",
+        random_state=42,
+        **model_params
+    )
+
+    return Pipeline(steps=[
+        ("preprocessor", preprocessor),
+        ("model", xgb)
+    ])
 
-smape = np.mean(
-    2 * np.abs(y_pred - y_test) /
-    (np.abs(y_test) + np.abs(y_pred))
-) * 100
 
-print("\n📊 FINAL MODEL PERFORMANCE")
-print(f"MAE   : {mae:.2f}")
-print(f"RMSE  : {rmse:.2f}")
-print(f"R²    : {r2:.3f}")
-print(f"SMAPE : {smape:.2f}%")
-
-# =====================================================
-# 11. PEAK DEMAND DERIVATION (IMPORTANT)
 # =====================================================
-results = X_test.copy()
-results["Actual_Demand"] = y_test.values
-results["Predicted_Demand"] = y_pred
-results["Datetime"] = datetime_series.iloc[X_test.index].values
-results["Date"] = pd.to_datetime(results["Datetime"]).dt.date
-
-daily_peak = results.groupby("Date")[["Actual_Demand", "Predicted_Demand"]].max()
-
-print("\n📈 Sample Daily Peak Demand Prediction:")
-print(daily_peak.head())
-
-# =====================================================
-# 12. PEAK RISK CLASSIFICATION
+# 6. TIME SERIES CROSS VALIDATION
 # =====================================================
-p90 = np.percentile(y_train, 90)
-p95 = np.percentile(y_train, 95)
+def full_search(X_train, y_train, n_iter=25, topology=None):
+    # RandomizedSearchCV over the whole pipeline (the original search).
+    # Workers train on a shared memmap of the encoded frame; the winner is
+    # refit on the DataFrame so the saved pipeline keeps its column names
+    start = time.perf_counter()
+    topology = topology or resolve_topology(tasks=n_iter * 5)
+    pipeline = build_pipeline(X_train, n_jobs=topology.threads)
+
+    with shared_arrays(X=encode_frame(X_train), y=np.asarray(y_train, dtype=np.float64)) as shared:
+        search = RandomizedSearchCV(
+            positional_pipeline(pipeline, X_train.columns),
+            param_distributions=param_grid,
+            n_iter=n_iter,
+            scoring="neg_root_mean_squared_error",
+            cv=TimeSeriesSplit(n_splits=5),
+            n_jobs=topology.workers,
+            refit=False,
+            verbose=1,
+            random_state=42
+        )
+        with parallel_config(topology):
+            search.fit(shared["X"], shared["y"])
+
+    # Refit with XGBoost's default threading: n_jobs is pickled with the
+    # model and would also cap the API's inference threads
+    best_model = build_pipeline(X_train).set_params(**search.best_params_)
+    best_model.fit(X_train, y_train)
+    return best_model, {
+        "best_params": search.best_params_,
+        "cv_rmse": float(-search.best_score_),
+        "candidates": n_iter,
+        "fits": n_iter * 5,
+        "topology": "%dx%d" % topology,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def fast_search_fit(X_train, y_train, n_iter=25, eta=3, halving=True, topology=None):
+    # Encode once, search on cached fold matrices, refit the winner as
+    # the usual pipeline so the saved artifact is unchanged in shape
+    start = time.perf_counter()
+    topology = topology or resolve_topology(tasks=n_iter)
+    preprocessor = build_pipeline(X_train).named_steps["preprocessor"]
+    matrix = preprocessor.fit_transform(X_train).astype(np.float32)
+    folds = list(TimeSeriesSplit(n_splits=5).split(matrix))
+
+    report = fast_search(matrix, y_train, folds, param_grid, n_iter=n_iter, eta=eta, halving=halving,
+                         topology=topology)
+
+    model_params = {name.replace("model__", ""): value for name, value in report["best_params"].items()}
+    best_model = build_pipeline(X_train, **model_params)
+    best_model.fit(X_train, y_train)
+
+    report["seconds"] = time.perf_counter() - start
+    return best_model, report
+
+
+def print_report(name, report):
+    print(f"\n✅ {name} search: {report['candidates']} candidates, {report['fits']} fold fits, "
+          f"{report['seconds']:.1f}s wall clock ({report['topology']} workers x threads)")
+    print(f"   CV RMSE: {report['cv_rmse']:.3f}")
+    print(f"   Best Hyperparameters: {report['best_params']}")
 
-def classify_peak(value):
-    if value >= p95:
-        return "CRITICAL"
-    elif value >= p90:
-        return "HIGH"
-    else:
-        return "NORMAL"
-
-daily_peak["Risk_Level"] = daily_peak["Predicted_Demand"].apply(classify_peak)
-
-print("\n⚠️ Peak Risk Levels:")
-print(daily_peak.head())
 
 # =====================================================
-# 13. SAVE MODEL
+# 10. EVALUATION
 # =====================================================
-joblib.dump(best_model, "final_electricity_demand_model.pkl")
-
-print("\n✅ Model saved as final_electricity_demand_model.pkl")
+def evaluate(y_test, y_pred):
+    mae = mean_absolute_error(y_test, y_pred)
+    rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+    r2 = r2_score(y_test, y_pred)
+
+    smape = np.mean(
+        2 * np.abs(y_pred - y_test) /
+        (np.abs(y_test) + np.abs(y_pred))
+    ) * 100
+
+    print("\n📊 FINAL MODEL PERFORMANCE")
+    print(f"MAE   : {mae:.2f}")
+    print(f"RMSE  : {rmse:.2f}")
+    print(f"R²    : {r2:.3f}")
+    print(f"SMAPE : {smape:.2f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the hourly demand model")
+    parser.add_argument("--search", choices=["full", "fast"], default="full",
+                        help="full: RandomizedSearchCV over the pipeline; "
+                             "fast: cached fold matrices + early stopping + successive halving")
+    parser.add_argument("--n-iter", type=int, default=25, help="candidates sampled from the grid")
+    parser.add_argument("--eta", type=int, default=3, help="halving factor (fast search)")
+    parser.add_argument("--no-halving", action="store_true", help="fast search: every candidate on every fold")
+    parser.add_argument("--compare", action="store_true",
+                        help="also run the other search and report both wall-clock times")
+    parser.add_argument("--topology", default=None,
+                        help="'auto' or '<workers>x<threads>' (default: $TRAIN_TOPOLOGY or auto)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="keep boosting the model at --output on rows after its training watermark; "
+                             "falls back to a full build when drift or new categories call for one")
+    parser.add_argument("--min-new-rows", type=int, default=MIN_NEW_ROWS,
+                        help="incremental: fewer new rows than this are left for the next run")
+    parser.add_argument("--max-rounds", type=int, default=MAX_ROUNDS,
+                        help="incremental: cap on trees added per run")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--output", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    # =====================================================
+    # 6b. INCREMENTAL UPDATE (WARM START)
+    # =====================================================
+    if args.incremental:
+        current = joblib.load(args.output) if os.path.exists(args.output) else None
+        metadata = load_metadata(args.output) if current is not None else None
+
+        # Only the rows after the watermark are read
+        filters = [("Datetime", ">", pd.Timestamp(metadata["watermark"]))] if metadata else None
+        X_new, y_new, times_new = load_data(args.data, filters)
+        updated, metadata, outcome = incremental_update(
+            current, metadata, X_new, y_new, times_new,
+            min_new_rows=args.min_new_rows, max_rounds=args.max_rounds
+        )
+        print(f"\n🔁 Incremental update: {outcome['status']} ({outcome.get('new_rows', 0)} new rows "
+              f"after {outcome.get('watermark', 'n/a')})")
+
+        if outcome["status"] in ("updated", "unchanged"):
+            if updated is not current:
+                joblib.dump(updated, args.output)
+                print(f"✅ Added {outcome['trees_added']} trees, model saved as {args.output}")
+
+                # The holdout evaluation described the previous model:
+                # re-score the same holdout rows (never trained on)
+                holdout = metadata["holdout"]
+                X_test, y_test, times_test = load_data(args.data, [
+                    ("Datetime", ">=", pd.Timestamp(holdout["start"])),
+                    ("Datetime", "<=", pd.Timestamp(holdout["end"]))
+                ])
+                p90, p95 = load_evaluation(evaluation_path(args.output))["thresholds"]
+                save_evaluation(evaluation_path(args.output), build_evaluation(
+                    times_test.values, X_test["Hour"].values, y_test.values,
+                    updated.predict(X_test), p90, p95
+                ))
+                print(f"✅ Evaluation re-scored, saved as {evaluation_path(args.output)}")
+            save_metadata(args.output, metadata)
+            print(f"✅ Watermark moved to {metadata['watermark']}")
+            sys.exit(0)
+        if outcome["status"] == "deferred":
+            sys.exit(0)
+
+        for reason in outcome["reasons"]:
+            print(f"   full rebuild: {reason}")
+
+    X, y, datetime_series = load_data(args.data)
+
+    # =====================================================
+    # 7. TRAIN / TEST SPLIT (TIME AWARE)
+    # =====================================================
+    split_idx = int(len(X) * 0.8)
+
+    X_train, X_test = X.iloc[:split_idx], X.iloc[split_idx:]
+    y_train, y_test = y.iloc[:split_idx], y.iloc[split_idx:]
+
+    # =====================================================
+    # 8. TRAIN MODEL
+    # =====================================================
+    searches = {
+        "full": lambda: full_search(X_train, y_train, args.n_iter,
+                                    resolve_topology(args.topology, tasks=args.n_iter * 5)),
+        "fast": lambda: fast_search_fit(X_train, y_train, args.n_iter, args.eta, not args.no_halving,
+                                        resolve_topology(args.topology, tasks=args.n_iter)),
+    }
+    best_model, report = searches[args.search]()
+    print_report(args.search, report)
+
+    if args.compare:
+        other = "fast" if args.search == "full" else "full"
+        other_model, other_report = searches[other]()
+        print_report(other, other_report)
+        print(f"\n⏱  fast vs full wall clock: "
+              f"{min(report, other_report, key=lambda r: r['seconds'])['seconds']:.1f}s vs "
+              f"{max(report, other_report, key=lambda r: r['seconds'])['seconds']:.1f}s")
+        for name, candidate in ((args.search, best_model), (other, other_model)):
+            print(f"   {name}: test RMSE {np.sqrt(mean_squared_error(y_test, candidate.predict(X_test))):.3f}")
+
+    # =====================================================
+    # 9. PREDICTION
+    # =====================================================
+    y_pred = best_model.predict(X_test)
+
+    evaluate(y_test, y_pred)
+
+    # =====================================================
+    # 11. PEAK DEMAND DERIVATION (IMPORTANT)
+    # =====================================================
+    results = X_test.copy()
+    results["Actual_Demand"] = y_test.values
+    results["Predicted_Demand"] = y_pred
+    results["Datetime"] = datetime_series.iloc[X_test.index].values
+    results["Date"] = pd.to_datetime(results["Datetime"]).dt.date
+
+    daily_peak = results.groupby("Date")[["Actual_Demand", "Predicted_Demand"]].max()
+
+    print("\n📈 Sample Daily Peak Demand Prediction:")
+    print(daily_peak.head())
+
+    # =====================================================
+    # 12. PEAK RISK CLASSIFICATION
+    # =====================================================
+    p90 = np.percentile(y_train, 90)
+    p95 = np.percentile(y_train, 95)
+
+    def classify_peak(value):
+        if value >= p95:
+            return "CRITICAL"
+        elif value >= p90:
+            return "HIGH"
+        else:
+            return "NORMAL"
+
+    daily_peak["Risk_Level"] = daily_peak["Predicted_Demand"].apply(classify_peak)
+
+    print("\n⚠️ Peak Risk Levels:")
+    print(daily_peak.head())
+
+    # =====================================================
+    # 13. SAVE MODEL + EVALUATION ARTIFACT
+    # =====================================================
+    joblib.dump(best_model, args.output)
+
+    print(f"\n✅ Model saved as {args.output}")
+
+    # Watermark / params / categories for later --incremental runs. The
+    # watermark is the last row of the whole dataset: the holdout rows are
+    # kept for evaluation, never boosted on later.
+    save_metadata(args.output, build_metadata(
+        best_model, X_train, y_train,
+        watermark=datetime_series.iloc[-1],
+        holdout=(datetime_series.iloc[split_idx], datetime_series.iloc[-1]),
+        best_params=report["best_params"],
+        holdout_rmse=np.sqrt(mean_squared_error(y_test, y_pred))
+    ))
+
+    evaluation = build_evaluation(
+        results["Datetime"].values,
+        X_test["Hour"].values,
+        y_test.values,
+        y_pred,
+        p90,
+        p95
+    )
+    save_evaluation(evaluation_path(args.output), evaluation)
+
+    print(f"✅ Evaluation saved as {evaluation_path(args.output)}")
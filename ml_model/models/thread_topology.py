@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+from contextlib import contextmanager
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+
+# =====================================================
+# TRAINING THREAD TOPOLOGY
+# =====================================================
+# Outer parallel workers (search candidates / CV folds) x inner XGBoost
+# threads per fit. sklearn's n_jobs=-1 starts one worker per core and
+# every XGBoost `hist` fit inside it defaults to all cores as well, so
+# cores^2 threads fight over the CPU. workers * threads stays <= cores.
+#
+# Spec: "auto" or "<workers>x<threads>" (e.g. "8x4"); TRAIN_TOPOLOGY and
+# TRAIN_CORES override the defaults.
+
+Topology = namedtuple("Topology", ["workers", "threads"])
+
+
+def available_cores():
+    if os.environ.get("TRAIN_CORES"):
+        return int(os.environ["TRAIN_CORES"])
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def resolve_topology(spec=None, tasks=None, cores=None):
+    # tasks: number of independent fits the outer level can run at once
+    spec = spec or os.environ.get("TRAIN_TOPOLOGY", "auto")
+    cores = cores or available_cores()
+
+    if spec == "auto":
+        # Independent fits scale better than threads inside one small
+        # `hist` fit, so spend cores on workers first; leftover cores go
+        # to threads when there are fewer tasks than cores
+        workers = max(1, min(tasks or cores, cores))
+        return Topology(workers, max(1, cores // workers))
+
+    try:
+        workers, threads = (int(part) for part in spec.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Topology must be 'auto' or '<workers>x<threads>', got '{spec}'")
+    if workers < 1 or threads < 1:
+        raise ValueError(f"Topology needs at least 1 worker and 1 thread, got '{spec}'")
+    return Topology(workers, threads)
+
+
+def parallel_config(topology):
+    # Caps OpenMP/BLAS pools inside loky workers as well, for anything
+    # that does not take an explicit thread count
+    return joblib.parallel_config(backend="loky", n_jobs=topology.workers,
+                                  inner_max_num_threads=topology.threads)
+
+
+# =====================================================
+# SHARED (MEMORY-MAPPED) TRAINING DATA
+# =====================================================
+def encode_frame(X):
+    # Numeric float32 matrix of X: categorical columns become their codes
+    # in sorted category order (the column order OneHotEncoder produces)
+    columns = []
+    for name in X.columns:
+        values = X[name]
+        if values.dtype == object or isinstance(values.dtype, pd.CategoricalDtype):
+            values = pd.Categorical(values.astype(str)).codes
+        columns.append(np.asarray(values, dtype=np.float32))
+    return np.column_stack(columns)
+
+
+def positional_pipeline(pipeline, columns):
+    # Unfitted clone whose ColumnTransformer selects by position, so it can
+    # train on the encode_frame() matrix; one-hot on the codes gives the
+    # same design matrix as one-hot on the strings
+    columns = list(columns)
+    pipeline = clone(pipeline)
+    preprocessor = pipeline.named_steps["preprocessor"]
+    preprocessor.set_params(transformers=[
+        (name, transformer, [columns.index(c) for c in selected])
+        for name, transformer, selected in preprocessor.transformers
+    ])
+    return pipeline
+
+
+@contextmanager
+def shared_arrays(**arrays):
+    # Dumps the arrays once and yields read-only memmaps of them. joblib
+    # sends a memmap to loky workers as a file reference, so each worker
+    # maps the same pages instead of unpickling its own copy.
+    folder = tempfile.mkdtemp(prefix="train-shared-")
+    try:
+        shared = {}
+        for name, array in arrays.items():
+            path = os.path.join(folder, f"{name}.mmap")
+            joblib.dump(np.ascontiguousarray(array), path)
+            shared[name] = joblib.load(path, mmap_mode="r")
+        yield shared
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
@@ -0,0 +1,135 @@
+import atexit
+import os
+import threading
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from forecasting import HISTORY, RollingFeatureState
+
+# =====================================================
+# ONLINE PER-CITY FEATURE STATE
+# =====================================================
+# Hourly demand readings are pushed per city as they arrive; every lag /
+# rolling feature is then available in O(1) for the next hour, so
+# /predict callers only send city + time + weather/price. The state is
+# snapshotted to disk periodically so a restart resumes without replay.
+
+ONE_HOUR = pd.Timedelta(hours=1)
+
+
+class OnlineFeatureStore:
+
+    def __init__(self, path=None):
+        self.path = path
+        self._series = {}        # City -> {"State", "UrbanRural", "last_time", "state"}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._stop = threading.Event()
+
+    @classmethod
+    def load(cls, path):
+        store = cls(path)
+        if path and os.path.exists(path):
+            store._series = joblib.load(path)
+        return store
+
+    # ---------------- ingest ----------------
+    def knows(self, city):
+        with self._lock:
+            return city in self._series
+
+    def ingest(self, city, timestamp, demand, state=None, urban_rural=None):
+        # Returns the number of hours forward-filled before this reading,
+        # or None when the reading is not newer than the city's last one
+        time = pd.Timestamp(timestamp).floor("h")
+        demand = float(demand)
+        if pd.isna(time) or not np.isfinite(demand):
+            raise ValueError(f"Invalid reading for '{city}': timestamp {timestamp!r}, demand {demand!r}")
+
+        with self._lock:
+            entry = self._series.get(city)
+            if entry is None:
+                if state is None or urban_rural is None:
+                    raise LookupError(f"Unknown city '{city}': State and UrbanRural are required")
+                entry = self._series[city] = {
+                    "State": state, "UrbanRural": urban_rural,
+                    "last_time": None, "state": RollingFeatureState()
+                }
+
+            filled = 0
+            if entry["last_time"] is not None:
+                gap = int((time - entry["last_time"]) / ONE_HOUR)
+                if gap <= 0:
+                    return None
+                if gap > HISTORY:
+                    # Nothing of the old window survives: start over
+                    entry["state"] = RollingFeatureState()
+                else:
+                    # Missing meter hours carry the last reading forward
+                    last = entry["state"].lag(1)
+                    for _ in range(gap - 1):
+                        entry["state"].push(last)
+                    filled = gap - 1
+
+            entry["state"].push(demand)
+            entry["last_time"] = time
+            self._dirty = True
+            return filled
+
+    # ---------------- features ----------------
+    def features(self, city, timestamp=None):
+        # Model inputs derived from the stream for the hour after the last
+        # reading (the only hour the lags describe exactly)
+        with self._lock:
+            entry = self._series.get(city)
+            if entry is None:
+                raise LookupError(f"No readings ingested for city '{city}'")
+
+            target = entry["last_time"] + ONE_HOUR
+            if timestamp is not None and pd.Timestamp(timestamp).floor("h") != target:
+                raise ValueError(
+                    f"State for '{city}' is at {entry['last_time']:%Y-%m-%d %H:%M}; "
+                    f"it can predict {target:%Y-%m-%d %H:%M} (use /forecast for later hours)"
+                )
+
+            features = entry["state"].features()
+            features.update(State=entry["State"], UrbanRural=entry["UrbanRural"])
+            return target, features
+
+    def status(self):
+        with self._lock:
+            return {
+                city: {
+                    "last_reading": entry["last_time"].strftime("%Y-%m-%d %H:%M"),
+                    "readings": min(entry["state"].readings, HISTORY),
+                    "ready": entry["state"].ready
+                }
+                for city, entry in self._series.items()
+            }
+
+    # ---------------- snapshots ----------------
+    def snapshot(self):
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            joblib.dump(self._series, tmp_path)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def start_snapshots(self, interval):
+        def loop():
+            while not self._stop.wait(interval):
+                self.snapshot()
+
+        threading.Thread(target=loop, name="feature-state-snapshots", daemon=True).start()
+        atexit.register(self.snapshot)
+
+    def stop(self):
+        self._stop.set()
+        self.snapshot()
@@ -0,0 +1,40 @@
+import threading
+
+import numpy as np
+
+# =====================================================
+# FIXED-SIZE HISTORY FOR THE LIVE DASHBOARDS
+# =====================================================
+# Preallocated numpy columns written in place: appending is O(1), memory
+# is fixed by the window no matter how long the app runs.
+
+
+class RingBuffer:
+
+    def __init__(self, window, fields):
+        # fields: {name: numpy dtype}
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = window
+        self.columns = {name: np.zeros(window, dtype=dtype) for name, dtype in fields.items()}
+        self._next = 0          # slot the next row goes to
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def append(self, **row):
+        with self._lock:
+            for name, column in self.columns.items():
+                column[self._next] = row[name]
+            self._next = (self._next + 1) % self.window
+            self._count = min(self._count + 1, self.window)
+
+    def snapshot(self):
+        # Oldest-to-newest copies of every column
+        with self._lock:
+            if self._count < self.window:
+                return {name: column[:self._count].copy() for name, column in self.columns.items()}
+            order = np.r_[self._next:self.window, 0:self._next]
+            return {name: column[order] for name, column in self.columns.items()}
@@ -1,40 +1,213 @@
+import argparse
+import os
+import sys
+import time
+
 import pandas as pd
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dataset
 
 # ======================================
-# LOAD DATASET
+# CONFIG
 # ======================================
-df = pd.read_csv("synthetic_electricity_demand_10000.csv")
+INPUT_PATH = "synthetic_electricity_demand_10000.csv"
+OUTPUT_PATH = "electricity_demand_with_history.csv"
+TARGET = "Hourly_Electricity_Demand"
+
+# Longest look-back of any feature: rows that must be carried between chunks
+HISTORY = 168
+
+LAGS = [
+    ("load_t_1", 1),
+    ("load_t_24", 24),
+    ("load_t_168", 168),
+]
+
+# Rolling statistics (trend capture), window includes the current row
+ROLLING = [
+    ("rolling_mean_24", 24, "mean"),
+    ("rolling_max_24", 24, "max"),
+    ("rolling_std_24", 24, "std"),
+    ("rolling_mean_168", 168, "mean"),
+]
+
+STD_BLOCK_ROWS = 65536
 
-# Convert to datetime and sort
-df['Datetime'] = pd.to_datetime(df['Datetime'])
-df = df.sort_values('Datetime').reset_index(drop=True)
 
 # ======================================
-# ADD HISTORICAL LOAD FEATURES
+# FEATURE COMPUTATION
 # ======================================
-# Lag features
-df['load_t_1'] = df['Hourly_Electricity_Demand'].shift(1)
-df['load_t_24'] = df['Hourly_Electricity_Demand'].shift(24)
-df['load_t_168'] = df['Hourly_Electricity_Demand'].shift(168)
+# Every rolling value is reduced from exactly its own window, so a row's
+# features depend only on the rows in its window. That is what lets the
+# streaming path (which restarts on every chunk) match the batch path
+# bit-for-bit; pandas' running-sum rolling() drifts by a few ulps with the
+# starting point.
+
+def _window_stat(values, window, stat):
+    out = np.full(len(values), np.nan)
+    if len(values) < window:
+        return out
+
+    windows = sliding_window_view(values, window)
+    if stat == "mean":
+        out[window - 1:] = windows.mean(axis=1)
+    elif stat == "max":
+        out[window - 1:] = windows.max(axis=1)
+    else:
+        # std allocates a (rows, window) temporary, so go block by block
+        for start in range(0, len(windows), STD_BLOCK_ROWS):
+            block = windows[start:start + STD_BLOCK_ROWS]
+            out[window - 1 + start:window - 1 + start + len(block)] = block.std(axis=1, ddof=1)
+    return out
+
 
-# Rolling statistics (trend capture)
-df['rolling_mean_24'] = df['Hourly_Electricity_Demand'].rolling(window=24).mean()
-df['rolling_max_24'] = df['Hourly_Electricity_Demand'].rolling(window=24).max()
-df['rolling_std_24'] = df['Hourly_Electricity_Demand'].rolling(window=24).std()
+def history_features(demand, groups=None):
+    # Returns {feature name: array} aligned with `demand`. With `groups`
+    # (e.g. the City column) lags/windows never cross group boundaries.
+    values = np.asarray(demand, dtype=np.float64)
+    n = len(values)
+
+    if groups is None:
+        order = None
+        position = np.arange(n)
+    else:
+        codes = pd.factorize(np.asarray(groups))[0]
+        order = np.argsort(codes, kind="stable")
+        values = values[order]
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        lengths = np.diff(np.r_[starts, n])
+        position = np.arange(n) - np.repeat(starts, lengths)   # index inside own group
+
+    features = {}
+
+    for name, lag in LAGS:
+        out = np.full(n, np.nan)
+        out[lag:] = values[:-lag]
+        out[position < lag] = np.nan
+        features[name] = out
+
+    for name, window, stat in ROLLING:
+        out = _window_stat(values, window, stat)
+        out[position < window - 1] = np.nan
+        features[name] = out
+
+    if order is not None:
+        for name, out in features.items():
+            unsorted = np.empty_like(out)
+            unsorted[order] = out
+            features[name] = unsorted
+
+    return features
+
+
+def add_features(df, by=None):
+    features = history_features(df[TARGET], None if by is None else df[by])
+    for name, values in features.items():
+        df[name] = values
+    return df
 
-df['rolling_mean_168'] = df['Hourly_Electricity_Demand'].rolling(window=168).mean()
 
 # ======================================
-# DROP NaN ROWS (created due to lagging)
+# BATCH PATH (whole file in memory)
 # ======================================
-df = df.dropna().reset_index(drop=True)
+def build_batch(input_path, output_path, by=None, columnar=True):
+    df = pd.read_csv(input_path)
+
+    # Convert to datetime and sort
+    df['Datetime'] = pd.to_datetime(df['Datetime'])
+    df = df.sort_values('Datetime', kind="stable").reset_index(drop=True)
+
+    add_features(df, by)
+
+    # Drop NaN rows (created due to lagging)
+    df = df.dropna().reset_index(drop=True)
+    df.to_csv(output_path, index=False)
+
+    # Typed Parquet copy that the loaders prefer over the CSV
+    if columnar:
+        dataset.write_columnar(df, dataset.columnar_path(output_path), source_csv=output_path)
+    return df
+
 
 # ======================================
-# SAVE UPDATED DATASET
+# STREAMING PATH (bounded memory)
 # ======================================
-df.to_csv("electricity_demand_with_history.csv", index=False)
+def build_streaming(input_path, output_path, chunk_rows=1_000_000, by=None, columnar=True):
+    # Input must already be sorted by Datetime (the generator writes it that
+    # way). The last HISTORY rows (per group when `by` is set) are carried
+    # into the next chunk so lags and windows see across the boundary.
+    carry = None
+    last_time = None
+    rows_in = rows_out = 0
+    writer = dataset.ColumnarWriter(dataset.columnar_path(output_path), output_path) if columnar else None
+
+    for i, chunk in enumerate(pd.read_csv(input_path, chunksize=chunk_rows)):
+        chunk['Datetime'] = pd.to_datetime(chunk['Datetime'])
+
+        times = chunk['Datetime']
+        if not times.is_monotonic_increasing or (last_time is not None and times.iloc[0] < last_time):
+            raise ValueError("Streaming mode needs input sorted by Datetime; use --mode batch")
+        last_time = times.iloc[-1]
+
+        n_carry = 0 if carry is None else len(carry)
+        frame = chunk if carry is None else pd.concat([carry, chunk], ignore_index=True)
+        raw_columns = list(chunk.columns)
+
+        add_features(frame, by)
+
+        out = frame.iloc[n_carry:].dropna()
+        out.to_csv(output_path, index=False, mode="w" if i == 0 else "a", header=i == 0)
+        if writer is not None:
+            writer.write(out)
+
+        tail = frame[raw_columns] if by is None else frame[raw_columns].groupby(by, sort=False)
+        carry = tail.tail(HISTORY).reset_index(drop=True)
+
+        rows_in += len(chunk)
+        rows_out += len(out)
+
+    if writer is not None:
+        writer.close()
+    return rows_in, rows_out
+
+
+# ======================================
+# ADD HISTORICAL LOAD FEATURES
+# ======================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add lag / rolling demand features")
+    parser.add_argument("--input", default=INPUT_PATH)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--mode", choices=["batch", "stream"], default="batch")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    parser.add_argument("--by-city", action="store_true",
+                        help="keep separate lag/rolling state per City")
+    parser.add_argument("--no-columnar", action="store_true",
+                        help="skip the typed Parquet copy of the output")
+    args = parser.parse_args()
+
+    by = "City" if args.by_city else None
+    columnar = not args.no_columnar and dataset.pq is not None
+    start = time.perf_counter()
+
+    if args.mode == "batch":
+        df = build_batch(args.input, args.output, by, columnar)
+        rows_in, rows_out = None, len(df)
+    else:
+        rows_in, rows_out = build_streaming(args.input, args.output, args.chunk_rows, by, columnar)
+
+    elapsed = time.perf_counter() - start
 
-print("✅ Historical load features added successfully!")
-print("Final shape:", df.shape)
-print("\nSample rows:")
-print(df.head())
+    print("✅ Historical load features added successfully!")
+    if args.mode == "batch":
+        print("Final shape:", df.shape)
+        print("\nSample rows:")
+        print(df.head())
+        print(f"\nElapsed: {elapsed:.2f}s")
+    else:
+        print("Rows written:", rows_out)
+        print(f"Throughput: {rows_in / elapsed:,.0f} rows/sec ({rows_in} rows in {elapsed:.2f}s)")
@@ -43,16 +43,20 @@
 # df.to_excel(file_path, index=False)
 
 # print(f"Dataset saved as {file_path}")
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
 
-np.random.seed(42)
-
 # ======================================
 # BASIC CONFIG
 # ======================================
 NUM_ROWS = 10000
 START_DATE = "2023-01-01"
+SEED = 42
+CHUNK_ROWS = 1_000_000
 
 states = {
     "Delhi": ["New Delhi"],
@@ -72,110 +76,253 @@ urban_rural_map = {
     "Lucknow": "Semi-Urban"
 }
 
+columns = [
+    "Datetime",
+    "State",
+    "City",
+    "UrbanRural",
+    "Hour",
+    "DayOfWeek",
+    "Month",
+    "IsWeekend",
+    "Temperature",
+    "Electricity_Price",
+    "Hourly_Electricity_Demand"
+]
+
 # ======================================
-# CREATE TIME INDEX (HOURLY)
+# LOOKUP TABLES (index arrays instead of dicts)
 # ======================================
-datetime_index = pd.date_range(
-    start=START_DATE,
-    periods=NUM_ROWS,
-    freq="H"
-)
+STATE_NAMES = list(states.keys())
+CITY_NAMES = [city for cities in states.values() for city in cities]
+AREA_NAMES = ["Urban", "Semi-Urban"]
+
+# first city index and city count for every state
+STATE_CITY_START = np.cumsum([0] + [len(c) for c in states.values()])[:-1]
+STATE_CITY_COUNT = np.array([len(c) for c in states.values()])
+CITY_AREA = np.array([AREA_NAMES.index(urban_rural_map[c]) for c in CITY_NAMES])
+
+# Seasonal base temperature, indexed by month (1-12)
+BASE_TEMP = np.array([0, 10, 15, 22, 28, 34, 36, 32, 31, 30, 25, 18, 12], dtype=float)
 
-data = []
 
 # ======================================
-# DATA GENERATION
+# DATA GENERATION (one chunk, vectorized)
 # ======================================
-for dt in datetime_index:
-    state = np.random.choice(list(states.keys()))
-    city = np.random.choice(states[state])
-    urban_rural = urban_rural_map[city]
+def generate_chunk(start, first_row, num_rows, rows_per_hour, seed):
+    rng = np.random.default_rng(seed)
+
+    # Row r belongs to hour r // rows_per_hour (see fit_rows_per_hour)
+    hour_offset = np.arange(first_row, first_row + num_rows) // rows_per_hour
+    datetime_index = pd.DatetimeIndex(
+        np.datetime64(pd.Timestamp(start), "ns") + hour_offset.astype("timedelta64[h]")
+    )
 
-    hour = dt.hour
-    day_of_week = dt.weekday()
-    month = dt.month
-    is_weekend = 1 if day_of_week >= 5 else 0
+    # Location: pick a state, then one of its cities
+    state = rng.integers(0, len(STATE_NAMES), num_rows)
+    city = STATE_CITY_START[state] + (rng.random(num_rows) * STATE_CITY_COUNT[state]).astype(np.int64)
+    urban_rural = CITY_AREA[city]
+
+    hour = datetime_index.hour.to_numpy()
+    day_of_week = datetime_index.dayofweek.to_numpy()
+    month = datetime_index.month.to_numpy()
+    is_weekend = (day_of_week >= 5).astype(np.int64)
 
     # -----------------------------
     # Temperature (seasonal)
     # -----------------------------
-    base_temp = {
-        12: 12, 1: 10, 2: 15,
-        3: 22, 4: 28, 5: 34,
-        6: 36, 7: 32, 8: 31,
-        9: 30, 10: 25, 11: 18
-    }[month]
-
-    temperature = base_temp + np.random.normal(0, 2)
+    temperature = BASE_TEMP[month] + rng.normal(0, 2, num_rows)
 
     # -----------------------------
     # Electricity Price
     # -----------------------------
-    electricity_price = np.random.uniform(4, 8)
+    electricity_price = rng.uniform(4, 8, num_rows)
 
     # -----------------------------
     # Base Demand (City Type)
     # -----------------------------
-    base_demand = 800 if urban_rural == "Urban" else 500
+    base_demand = np.where(urban_rural == 0, 800.0, 500.0)
 
-    # Hourly effect
-    if 18 <= hour <= 22:
-        base_demand += 400  # evening peak
-    elif 6 <= hour <= 9:
-        base_demand += 250  # morning peak
-    else:
-        base_demand += 100
+    # Hourly effect: evening peak, morning peak, rest of day
+    base_demand += np.select(
+        [(hour >= 18) & (hour <= 22), (hour >= 6) & (hour <= 9)],
+        [400, 250],
+        default=100
+    )
 
     # Temperature effect (AC load)
-    temp_effect = max(0, temperature - 22) * 35
+    temp_effect = np.maximum(0, temperature - 22) * 35
 
     # Weekend reduction
-    if is_weekend:
-        base_demand -= 150
+    base_demand -= 150 * is_weekend
 
     # Random noise
-    noise = np.random.normal(0, 50)
+    noise = rng.normal(0, 50, num_rows)
 
     hourly_demand = base_demand + temp_effect + noise
 
-    data.append([
-        dt,
-        state,
-        city,
-        urban_rural,
-        hour,
-        day_of_week,
-        month,
-        is_weekend,
-        round(temperature, 2),
-        round(electricity_price, 2),
-        round(hourly_demand, 2)
-    ])
+    return pd.DataFrame({
+        "Datetime": datetime_index,
+        "State": pd.Categorical.from_codes(state, STATE_NAMES),
+        "City": pd.Categorical.from_codes(city, CITY_NAMES),
+        "UrbanRural": pd.Categorical.from_codes(urban_rural, AREA_NAMES),
+        "Hour": hour,
+        "DayOfWeek": day_of_week,
+        "Month": month,
+        "IsWeekend": is_weekend,
+        "Temperature": np.round(temperature, 2),
+        "Electricity_Price": np.round(electricity_price, 2),
+        "Hourly_Electricity_Demand": np.round(hourly_demand, 2)
+    })
+
+
+def fit_rows_per_hour(num_rows, start_date=START_DATE, rows_per_hour=None):
+    # Timestamps are datetime64[ns], which ends at pd.Timestamp.max
+    # (2262-04-11); numpy wraps silently past it. None -> the smallest
+    # rows_per_hour whose last hour still fits; an explicit value that
+    # does not fit raises instead of writing wrapped timestamps.
+    start = pd.Timestamp(start_date)
+    hours = int((pd.Timestamp.max - start) // pd.Timedelta(hours=1)) + 1
+    needed = max(1, -(-num_rows // hours))
+    if rows_per_hour is None:
+        return needed
+    if rows_per_hour < needed:
+        raise ValueError(
+            f"{num_rows:,} rows at {rows_per_hour} per hour from {start} run past "
+            f"{pd.Timestamp.max}; use rows_per_hour >= {needed} or an earlier start"
+        )
+    return rows_per_hour
+
+
+def _generate_and_render(task, render):
+    chunk = generate_chunk(*task)
+    return chunk if render is None else render(chunk)
+
+
+def iter_chunks(num_rows=NUM_ROWS, start_date=START_DATE, seed=SEED,
+                chunk_rows=CHUNK_ROWS, workers=1, rows_per_hour=None, render=None):
+    # Yields DataFrame chunks in time order. Every chunk has its own RNG
+    # stream spawned from `seed`, so the output depends only on
+    # (seed, chunk_rows, rows_per_hour), never on the number of workers.
+    # `render` (a module-level function) runs inside the worker, so costly
+    # serialization such as CSV formatting is parallelized too.
+    rows_per_hour = fit_rows_per_hour(num_rows, start_date, rows_per_hour)
+    n_chunks = -(-num_rows // chunk_rows)
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+
+    tasks = [
+        (start_date, i * chunk_rows, min(chunk_rows, num_rows - i * chunk_rows), rows_per_hour, seeds[i])
+        for i in range(n_chunks)
+    ]
+
+    if workers <= 1:
+        for task in tasks:
+            yield _generate_and_render(task, render)
+        return
+
+    # Keep only a few chunks in flight so memory stays bounded
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for task in tasks:
+            pending.append(pool.submit(_generate_and_render, task, render))
+            if len(pending) >= 2 * workers:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
 
 # ======================================
-# CREATE DATAFRAME
+# CHUNKED OUTPUT
 # ======================================
-columns = [
-    "Datetime",
-    "State",
-    "City",
-    "UrbanRural",
-    "Hour",
-    "DayOfWeek",
-    "Month",
-    "IsWeekend",
-    "Temperature",
-    "Electricity_Price",
-    "Hourly_Electricity_Demand"
-]
+def render_csv(chunk):
+    return chunk.to_csv(index=False, header=False).encode("utf-8"), chunk.head()
+
+
+def render_parquet(chunk):
+    import pyarrow as pa
+    return pa.Table.from_pandas(chunk, preserve_index=False), chunk.head()
+
+
+def render_both(chunk):
+    csv_bytes, head = render_csv(chunk)
+    table, _ = render_parquet(chunk)
+    return (csv_bytes, table), head
+
+
+def write_dataset(rendered, csv_path=None, parquet_path=None):
+    # `rendered` yields (payload, head) from one of the render_* functions;
+    # each chunk is appended and dropped, so memory stays at ~one chunk
+    csv_file = open(csv_path, "wb") if csv_path else None
+    parquet_writer = None
+    total = 0
+    first = None
+
+    try:
+        if csv_file:
+            csv_file.write((",".join(columns) + "\n").encode("utf-8"))
+
+        for payload, head in rendered:
+            if first is None:
+                first = head
+
+            if csv_path and parquet_path:
+                csv_bytes, table = payload
+            elif csv_path:
+                csv_bytes, table = payload, None
+            else:
+                csv_bytes, table = None, payload
+
+            if csv_bytes is not None:
+                csv_file.write(csv_bytes)
+
+            if table is not None:
+                import pyarrow.parquet as pq
+                if parquet_writer is None:
+                    parquet_writer = pq.ParquetWriter(parquet_path, table.schema)
+                parquet_writer.write_table(table)
+                total += table.num_rows
+            else:
+                total += csv_bytes.count(b"\n")
+    finally:
+        if csv_file:
+            csv_file.close()
+        if parquet_writer is not None:
+            parquet_writer.close()
+
+    return total, first
 
-df = pd.DataFrame(data, columns=columns)
 
 # ======================================
 # SAVE DATASET
 # ======================================
-df.to_csv("synthetic_electricity_demand_10000.csv", index=False)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic hourly electricity demand data")
+    parser.add_argument("--rows", type=int, default=NUM_ROWS)
+    parser.add_argument("--start", default=START_DATE)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--rows-per-hour", type=int, default=None,
+                        help="rows sharing one timestamp (default: 1, or the smallest "
+                             "value that keeps the last row before 2262)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--format", choices=["csv", "parquet", "both"], default="csv")
+    parser.add_argument("--out", default=None, help="output path without extension")
+    args = parser.parse_args()
+
+    try:
+        rows_per_hour = fit_rows_per_hour(args.rows, args.start, args.rows_per_hour)
+    except ValueError as e:
+        parser.error(str(e))
+
+    out = args.out or f"synthetic_electricity_demand_{args.rows}"
+    csv_path = f"{out}.csv" if args.format in ("csv", "both") else None
+    parquet_path = f"{out}.parquet" if args.format in ("parquet", "both") else None
+
+    render = {"csv": render_csv, "parquet": render_parquet, "both": render_both}[args.format]
+    rendered = iter_chunks(args.rows, args.start, args.seed, args.chunk_rows,
+                           args.workers, rows_per_hour, render)
+    total, head = write_dataset(rendered, csv_path, parquet_path)
 
-print("✅ Dataset generated successfully!")
-print(df.head())
-print("\nTotal rows:", len(df))
+    print("✅ Dataset generated successfully!")
+    print(head)
+    print("\nTotal rows:", total)
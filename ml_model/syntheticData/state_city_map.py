@@ -1,7 +1,12 @@
-import pandas as pd
+import os
+import sys
 import json
 
-df = pd.read_csv("ml_model/models/electricity_demand_with_history.csv")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dataset import load_history
+
+# Only the two columns the mapping needs
+df = load_history("ml_model/data/electricity_demand_with_history.csv", columns=["State", "City"]).astype(str)
 
 state_city_map = (
     df[["State", "City"]]
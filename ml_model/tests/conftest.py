@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+# api.py and the scripts use repo-root relative paths (ml_model/...) and
+# import their siblings by module name
+ML_MODEL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = os.path.dirname(ML_MODEL_DIR)
+sys.path.insert(0, ML_MODEL_DIR)
+
+
+@pytest.fixture(scope="session")
+def api(tmp_path_factory):
+    os.chdir(REPO_ROOT)
+    import api
+
+    # Online feature snapshots go to a scratch file, not models/cache
+    api.FEATURE_STATE_PATH = str(tmp_path_factory.mktemp("features") / "state.joblib")
+    api.create_app()
+    return api
+
+
+@pytest.fixture
+def client(api):
+    return api.app.test_client()
@@ -0,0 +1,30 @@
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+TABULAR = ["/eda/hourly-trend", "/eda/city-wise", "/eda/weekend-vs-weekday", "/eda/urban-rural", "/eda/correlation"]
+
+
+@pytest.mark.parametrize("path", TABULAR)
+def test_arrow_format(client, path):
+    records = client.get(path).get_json()
+    response = client.get(path, query_string={"format": "arrow"})
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(response.data).read_all()
+    assert sorted(table.column_names) == sorted(records[0])
+    assert table.num_rows == len(records)
+
+
+@pytest.mark.parametrize("path", TABULAR)
+def test_columns_format(client, path):
+    records = client.get(path).get_json()
+    columns = client.get(path, query_string={"format": "columns"}).get_json()
+
+    assert columns == {name: [row[name] for row in records] for name in records[0]}
+
+
+def test_non_tabular_resource_refuses_other_formats(client):
+    assert client.get("/eda/demand-distribution", query_string={"format": "arrow"}).status_code == 406
+    assert client.get("/eda/demand-distribution").status_code == 200
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture(scope="module")
+def model(api):
+    return api.registry.active
+
+
+@pytest.fixture(scope="module")
+def row(api):
+    first = api.eda_df.iloc[0]
+    return {name: (str(first[name]) if name in ("State", "City", "UrbanRural") else float(first[name]))
+            for name in api.REQUIRED_FEATURES}
+
+
+def pipeline_predict(model, row):
+    frame = pd.DataFrame([{name: np.nan if value is None else value for name, value in row.items()}])
+    return float(model.pipeline.predict(frame[model.features])[0])
+
+
+@pytest.mark.parametrize("missing", [None, "Temperature", "load_t_24"])
+def test_compiled_path_matches_pipeline(model, row, missing):
+    if model.fast is None:
+        pytest.skip("pipeline layout is not compiled")
+    if missing:
+        row = dict(row, **{missing: None})
+
+    assert model.fast.predict_one(row) == pytest.approx(pipeline_predict(model, row), rel=1e-5)
+
+
+def test_predict_accepts_null_numeric(client, row):
+    response = client.post("/predict", json=dict(row, Temperature=None))
+
+    assert response.status_code == 200
+    assert np.isfinite(response.get_json()["predicted_hourly_demand"])
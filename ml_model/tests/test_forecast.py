@@ -0,0 +1,33 @@
+import pytest
+
+from forecasting import HISTORY
+
+
+def series(**overrides):
+    item = {
+        "State": "Maharashtra", "City": "Pune", "UrbanRural": "Urban",
+        "timestamp": "2024-02-21 15:00", "history": [1000.0] * HISTORY,
+        "Temperature": 25.0, "Electricity_Price": 6.0, "horizon": 6,
+    }
+    item.update(overrides)
+    return item
+
+
+def test_forecast(client):
+    response = client.post("/forecast", json=series())
+
+    assert response.status_code == 200
+    assert len(response.get_json()["forecasts"][0]["predicted_hourly_demand"]) == 6
+
+
+@pytest.mark.parametrize("field, value", [
+    ("Temperature", None),
+    ("Electricity_Price", [6.0, 6.0, None, 6.0, 6.0, 6.0]),
+    ("Temperature", "nan"),
+    ("history", [1000.0] * (HISTORY - 1) + [None]),
+])
+def test_non_finite_inputs_are_rejected(client, field, value):
+    response = client.post("/forecast", json=series(**{field: value}))
+
+    assert response.status_code == 400
+    assert field in response.get_json()["error"]
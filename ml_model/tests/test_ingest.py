@@ -0,0 +1,45 @@
+import pytest
+
+
+def reading(**overrides):
+    row = {"City": "Pune", "timestamp": "2030-01-01 00:00", "Hourly_Electricity_Demand": 900.0}
+    row.update(overrides)
+    return row
+
+
+@pytest.mark.parametrize("demand", ["nan", "inf", "-inf"])
+def test_non_finite_demand_is_rejected_before_any_row_is_applied(client, demand):
+    before = client.get("/ingest").get_json().get("Pune")
+    response = client.post("/ingest", json=[
+        reading(timestamp="2030-01-01 00:00"),
+        reading(timestamp="2030-01-01 01:00", Hourly_Electricity_Demand=demand),
+    ])
+
+    assert response.status_code == 400
+    assert "Row 1" in response.get_json()["error"]
+    assert client.get("/ingest").get_json().get("Pune") == before
+
+
+@pytest.mark.parametrize("timestamp", ["", None])
+def test_missing_timestamp_is_rejected(client, timestamp):
+    response = client.post("/ingest", json=[reading(), reading(timestamp=timestamp)])
+
+    assert response.status_code == 400
+    assert "Row 1" in response.get_json()["error"]
+
+
+def test_unknown_city_needs_state_and_area(client):
+    response = client.post("/ingest", json=[reading(City="Atlantis")])
+
+    assert response.status_code == 400
+    assert "Atlantis" in response.get_json()["error"]
+
+
+def test_valid_readings_are_accepted(client):
+    response = client.post("/ingest", json=[
+        reading(City="Mumbai", timestamp="2030-02-01 00:00"),
+        reading(City="Mumbai", timestamp="2030-02-01 01:00", Hourly_Electricity_Demand=950.0),
+    ])
+
+    assert response.status_code == 200
+    assert response.get_json()["accepted"] == 2
@@ -0,0 +1,25 @@
+import pytest
+
+
+@pytest.mark.parametrize("body, count", [
+    ([[50, 50, 50], [10, 90, 20]], 2),
+    ([50, 50, 50], 1),
+    ([{"energy_demand": 50, "available_power": 50, "grid_load": 50}], 1),
+    ({"energy_demand": [50, 10], "available_power": [50, 90], "grid_load": [50, 20]}, 2),
+])
+def test_input_forms(client, body, count):
+    response = client.post("/optimize", json=body)
+
+    assert response.status_code == 200
+    assert response.get_json()["count"] == count
+
+
+@pytest.mark.parametrize("body", [
+    [1, 2, 3, 4, 5, 6],
+    [[[1, 2, 3]]],
+    [[1, 2, 3, 4]],
+    [[1, 2], [3, 4], [5, 6]],
+    [],
+])
+def test_malformed_rows_are_rejected(client, body):
+    assert client.post("/optimize", json=body).status_code == 400
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope="module")
+def rows(api):
+    sample = api.eda_df.iloc[:5]
+    return [
+        {name: (str(row[name]) if name in ("State", "City", "UrbanRural") else float(row[name]))
+         for name in api.REQUIRED_FEATURES}
+        for _, row in sample.iterrows()
+    ]
+
+
+def single(client, row):
+    response = client.post("/predict", json=row)
+    assert response.status_code == 200
+    return response.get_json()["predicted_hourly_demand"]
+
+
+def test_batch_matches_single(client, rows):
+    response = client.post("/predict/batch", json=rows)
+
+    assert response.status_code == 200
+    assert response.get_json()["predicted_hourly_demand"] == pytest.approx([single(client, r) for r in rows], abs=0.011)
+
+
+def test_null_numeric_is_missing_in_both(client, rows):
+    row = dict(rows[0], Temperature=None)
+    response = client.post("/predict/batch", json=[row, rows[1]])
+
+    assert response.status_code == 200
+    batch = response.get_json()["predicted_hourly_demand"]
+    assert np.isfinite(batch[0])
+    assert batch[0] == pytest.approx(single(client, row), abs=0.011)
+
+
+def test_mixed_type_categorical(client, rows):
+    # A number where a City name is expected is an unknown category, as on /predict
+    row = dict(rows[0], City=5)
+    response = client.post("/predict/batch", json=[row, rows[1]])
+
+    assert response.status_code == 200
+    assert response.get_json()["predicted_hourly_demand"][0] == pytest.approx(single(client, row), abs=0.011)
+
+
+def test_non_numeric_value_is_rejected(client, rows):
+    response = client.post("/predict/batch", json=[dict(rows[0], Temperature="hot")])
+
+    assert response.status_code == 400
+    assert "Temperature" in response.get_json()["error"]